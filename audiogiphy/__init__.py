@@ -5,6 +5,8 @@ An experimental tool that turns a music track into a vertical video
 made from 1 second GIF clips, roughly synced to the track BPM.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 
 __all__ = [
@@ -17,6 +19,7 @@ __all__ = [
     "GiphyClient",
     "app",
     "detect_lyrics",
+    "detect_lyrics_batch",
     "LyricsResult",
     "LyricWord",
     "extract_lyric_anchors",
@@ -25,23 +28,44 @@ __all__ = [
     "plan_giphy_segments",
 ]
 
-from audiogiphy.render_pipeline import render_video
-from audiogiphy.audio_analysis import (
-    BpmSegment,
-    analyze_bpm_segments,
-    analyze_bpm_per_second,
-    analyze_global_bpm,
-)
-from audiogiphy.visual_builder import build_visual_track
-# GiphyClient from giphy_client.py (new implementation with API support)
-from audiogiphy.giphy_client import GiphyClient
-from audiogiphy.lyrics_analysis import detect_lyrics, LyricsResult, LyricWord
-from audiogiphy.lyrics_overlays import extract_lyric_anchors, map_anchors_to_seconds, build_karaoke_mapping
-from audiogiphy.lyrics_giphy_planner import plan_giphy_segments
-
-# Lazy import for API (only if flask is installed)
-try:
-    from audiogiphy.api import app
-except ImportError:
-    app = None
+# Public names are imported from their submodules on first access (PEP 562),
+# so that e.g. `python -m audiogiphy.cli --help` does not pay for importing
+# librosa, moviepy and the API server up front.
+_LAZY_ATTRS = {
+    "render_video": "audiogiphy.render_pipeline",
+    "BpmSegment": "audiogiphy.audio_analysis",
+    "analyze_bpm_segments": "audiogiphy.audio_analysis",
+    "analyze_bpm_per_second": "audiogiphy.audio_analysis",
+    "analyze_global_bpm": "audiogiphy.audio_analysis",
+    "build_visual_track": "audiogiphy.visual_builder",
+    # GiphyClient from giphy_client.py (new implementation with API support)
+    "GiphyClient": "audiogiphy.giphy_client",
+    "detect_lyrics": "audiogiphy.lyrics_analysis",
+    "detect_lyrics_batch": "audiogiphy.lyrics_analysis",
+    "LyricsResult": "audiogiphy.lyrics_analysis",
+    "LyricWord": "audiogiphy.lyrics_analysis",
+    "extract_lyric_anchors": "audiogiphy.lyrics_overlays",
+    "map_anchors_to_seconds": "audiogiphy.lyrics_overlays",
+    "build_karaoke_mapping": "audiogiphy.lyrics_overlays",
+    "plan_giphy_segments": "audiogiphy.lyrics_giphy_planner",
+    "app": "audiogiphy.api",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module_name), name)
+    except ImportError:
+        # The API is optional (only if fastapi is installed)
+        if name != "app":
+            raise
+        value = None
+    globals()[name] = value
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -1,75 +1,130 @@
 """
-Flask API server for AudioGiphy.
+FastAPI server for AudioGiphy.
 
 Provides REST endpoints and Server-Sent Events (SSE) for real-time log streaming
-during video rendering.
+during video rendering. The app is served over ASGI, so each open log stream is
+a coroutine rather than a server thread.
 """
 
+import asyncio
+import functools
 import json
 import logging
-import threading
+import os
 import uuid
-from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import AsyncIterator, List
 
-from flask import Flask, jsonify, request, Response, stream_with_context
-from flask_cors import CORS
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from audiogiphy.render_pipeline import render_video
-from audiogiphy.config import DEFAULT_RESOLUTION
+from audiogiphy.config import DEFAULT_RESOLUTION, API_RENDER_WORKERS, API_MAX_QUEUED_JOBS
+from audiogiphy.job_store import FINAL_STATUSES, create_job_store
 
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for Vue.js frontend
+# Job status and log storage (in-memory by default, Redis for multi-worker servers)
+job_store = create_job_store()
+
+# Seconds between SSE keepalive comments when a job is idle
+SSE_KEEPALIVE_SECONDS = 15.0
+# Seconds to collect a burst of log lines into one SSE frame
+SSE_COALESCE_SECONDS = 0.05
+
+# Loggers whose output is captured into a job's log stream
+_CAPTURED_LOGGERS = [
+    logging.getLogger(name)
+    for name in (
+        "audiogiphy.audio_analysis",
+        "audiogiphy.visual_builder",
+        "audiogiphy.render_pipeline",
+        "ffmpeg",
+        "audiogiphy.cli",
+    )
+]
+_LOG_FORMATTER = logging.Formatter("[%(name)s] %(message)s")
+
+# Bounded pool of render workers; extra jobs wait in the executor queue
+RENDER_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AUDIOGIPHY_WORKERS", API_RENDER_WORKERS)),
+    thread_name_prefix="render",
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Let in-flight renders finish before the server process exits.
+    
+    Renders still waiting in the queue are cancelled rather than run, so
+    shutdown is not held up by several full renders; their jobs are marked
+    as errors by _on_render_done.
+    """
+    yield
+    RENDER_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+
 
-# In-memory job storage (simple dict-based)
-jobs: Dict[str, Dict] = {}
-job_logs: Dict[str, deque] = {}
-job_lock = threading.Lock()
+app = FastAPI(title="AudioGiphy API", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])  # Enable CORS for Vue.js frontend
+
+
+def _sse(payload: dict) -> bytes:
+    """Serialize a payload as a Server-Sent Events data frame."""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(payload) + b"\n\n"
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+def _encode_log(message: str) -> bytes:
+    """Encode a log line as a JSON string, ready to be stored in the job store."""
+    if orjson is not None:
+        return orjson.dumps(message)
+    return json.dumps(message).encode("utf-8")
+
+
+def _sse_logs(entries: List[bytes]) -> bytes:
+    """Build a batched logs frame from already-encoded log entries."""
+    return b'data: {"type":"logs","messages":[' + b",".join(entries) + b"]}\n\n"
 
 
 class LogCaptureHandler(logging.Handler):
-    """Custom logging handler that captures logs to a deque for a job."""
+    """Custom logging handler that captures logs to the job store for a job."""
     
-    def __init__(self, job_id: str, max_logs: int = 1000):
+    def __init__(self, job_id: str):
         super().__init__()
         self.job_id = job_id
-        self.max_logs = max_logs
+        self.setFormatter(_LOG_FORMATTER)
         
     def emit(self, record):
-        """Emit a log record to the job's log deque."""
+        """Emit a log record to the job's captured logs."""
         try:
-            msg = self.format(record)
-            with job_lock:
-                if self.job_id not in job_logs:
-                    job_logs[self.job_id] = deque(maxlen=self.max_logs)
-                job_logs[self.job_id].append(msg)
+            if record.exc_info or record.stack_info:
+                msg = self.format(record)
+            else:
+                # Same output as _LOG_FORMATTER, without the Formatter overhead
+                msg = f"[{record.name}] {record.getMessage()}"
+            job_store.append_log(self.job_id, _encode_log(msg))
         except Exception:
             self.handleError(record)
 
 
 def run_render_job(job_id: str, params: dict):
-    """Run render_video in a background thread and capture logs."""
+    """Run render_video on a render worker thread and capture logs."""
     try:
-        with job_lock:
-            jobs[job_id]["status"] = "running"
+        job_store.update_job(job_id, "running")
         
-        # Set up log capture
+        # Set up log capture on all relevant loggers
         log_handler = LogCaptureHandler(job_id)
-        log_handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
-        
-        # Add handler to all relevant loggers
-        loggers_to_capture = [
-            logging.getLogger("audiogiphy.audio_analysis"),
-            logging.getLogger("audiogiphy.visual_builder"),
-            logging.getLogger("audiogiphy.render_pipeline"),
-            logging.getLogger("ffmpeg"),
-            logging.getLogger("audiogiphy.cli"),
-        ]
-        
-        for lg in loggers_to_capture:
+        for lg in _CAPTURED_LOGGERS:
             lg.addHandler(log_handler)
             lg.setLevel(logging.INFO)
         
@@ -84,64 +139,58 @@ def run_render_job(job_id: str, params: dict):
                 seed=params.get("seed"),
             )
             
-            with job_lock:
-                jobs[job_id]["status"] = "complete"
-                jobs[job_id]["message"] = "Render completed successfully"
+            job_store.update_job(job_id, "complete", "Render completed successfully")
                 
         except Exception as e:
             error_msg = str(e)
-            with job_lock:
-                jobs[job_id]["status"] = "error"
-                jobs[job_id]["message"] = error_msg
-                if job_id in job_logs:
-                    job_logs[job_id].append(f"[error] {error_msg}")
+            job_store.append_log(job_id, _encode_log(f"[error] {error_msg}"))
+            job_store.update_job(job_id, "error", error_msg)
         finally:
             # Remove log handlers
-            for lg in loggers_to_capture:
+            for lg in _CAPTURED_LOGGERS:
                 lg.removeHandler(log_handler)
                 
     except Exception as e:
-        with job_lock:
-            jobs[job_id]["status"] = "error"
-            jobs[job_id]["message"] = f"Job setup failed: {str(e)}"
+        job_store.update_job(job_id, "error", f"Job setup failed: {str(e)}")
 
 
-@app.route("/api/render", methods=["POST"])
-def start_render():
+def _on_render_done(job_id: str, future: Future) -> None:
+    """Give a job cancelled before it started a final status for its log stream."""
+    if future.cancelled():
+        job_store.update_job(job_id, "error", "Server shut down before the render started")
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    """Build a JSON error response."""
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+@app.post("/api/render")
+async def start_render(request: Request):
     """Start a new render job."""
     try:
-        data = request.get_json()
+        data = await request.json()
         
         # Validate required fields
         required = ["audio", "gif_folder", "duration_seconds", "output"]
         for field in required:
             if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+                return _error(f"Missing required field: {field}", 400)
         
         # Validate paths
         audio_path = Path(data["audio"])
         if not audio_path.exists():
-            return jsonify({"error": f"Audio file not found: {data['audio']}"}), 400
+            return _error(f"Audio file not found: {data['audio']}", 400)
         
         gif_folder = Path(data["gif_folder"])
         if not gif_folder.exists() or not gif_folder.is_dir():
-            return jsonify({"error": f"Video folder not found: {data['gif_folder']}"}), 400
+            return _error(f"Video folder not found: {data['gif_folder']}", 400)
         
         mp4_files = list(gif_folder.glob("*.mp4"))
         if not mp4_files:
-            return jsonify({"error": f"No MP4 files found in: {data['gif_folder']}"}), 400
+            return _error(f"No MP4 files found in: {data['gif_folder']}", 400)
         
-        # Create job
-        job_id = str(uuid.uuid4())
-        with job_lock:
-            jobs[job_id] = {
-                "status": "queued",
-                "params": data,
-                "message": "Job queued",
-            }
-            job_logs[job_id] = deque(maxlen=1000)
-        
-        # Start render in background thread
+        # Build render parameters
         params = {
             "audio": str(audio_path),
             "gif_folder": str(gif_folder),
@@ -152,64 +201,70 @@ def start_render():
             "seed": data.get("seed"),
         }
         
-        thread = threading.Thread(target=run_render_job, args=(job_id, params))
-        thread.daemon = True
-        thread.start()
+        # Create job (reject when too many renders are already waiting)
+        job_id = str(uuid.uuid4())
+        if not job_store.create_job(job_id, data, max_queued=API_MAX_QUEUED_JOBS):
+            return _error("Too many queued render jobs, try again later", 429)
+        
+        # Queue render on the worker pool
+        future = RENDER_EXECUTOR.submit(run_render_job, job_id, params)
+        future.add_done_callback(functools.partial(_on_render_done, job_id))
         
-        return jsonify({
+        return JSONResponse({
             "job_id": job_id,
             "status": "queued",
             "message": "Render job started",
-        }), 202
+        }, status_code=202)
         
     except Exception as e:
-        return jsonify({"error": f"Failed to start render: {str(e)}"}), 500
+        return _error(f"Failed to start render: {str(e)}", 500)
 
 
-@app.route("/api/logs/<job_id>", methods=["GET"])
-def stream_logs(job_id: str):
+@app.get("/api/logs/{job_id}")
+async def stream_logs(job_id: str):
     """Stream logs for a job using Server-Sent Events."""
     
-    def generate():
+    async def generate():
         """Generate SSE log stream."""
         # Send initial connection message
-        yield f"data: {json.dumps({'type': 'connected', 'job_id': job_id})}\n\n"
+        yield _sse({'type': 'connected', 'job_id': job_id})
         
-        # Send existing logs
-        with job_lock:
-            if job_id in job_logs:
-                for log_msg in job_logs[job_id]:
-                    yield f"data: {json.dumps({'type': 'log', 'message': log_msg})}\n\n"
+        if job_store.get_job(job_id) is None:
+            yield _sse({'type': 'error', 'message': 'Job not found'})
+            return
         
-        # Stream new logs
-        last_count = 0
+        # Stream logs as they arrive; the job store wakes us on new logs and
+        # status changes, so idle jobs don't poll
+        offset = 0
         while True:
-            with job_lock:
-                if job_id not in jobs:
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Job not found'})}\n\n"
-                    break
-                
-                job_status = jobs[job_id]["status"]
-                current_count = len(job_logs.get(job_id, []))
-                
-                # Send new logs
-                if job_id in job_logs and current_count > last_count:
-                    for i in range(last_count, current_count):
-                        log_msg = list(job_logs[job_id])[i]
-                        yield f"data: {json.dumps({'type': 'log', 'message': log_msg})}\n\n"
-                    last_count = current_count
-                
-                # Send status updates
-                if job_status in ["complete", "error"]:
-                    yield f"data: {json.dumps({'type': 'status', 'status': job_status, 'message': jobs[job_id].get('message', '')})}\n\n"
-                    break
+            if not await job_store.wait_for_update_async(job_id, offset, SSE_KEEPALIVE_SECONDS):
+                yield b": keepalive\n\n"
+                continue
+            
+            # Give the rest of a burst of log lines a moment to arrive so it
+            # goes out as a single frame
+            await asyncio.sleep(SSE_COALESCE_SECONDS)
+            
+            # Read status before logs so every line logged before a final
+            # status is sent before that status
+            job = job_store.get_job(job_id)
+            if job is None:
+                yield _sse({'type': 'error', 'message': 'Job not found'})
+                break
+            new_logs, offset = job_store.get_logs_since(job_id, offset)
             
-            import time
-            time.sleep(0.1)  # Poll every 100ms
+            # Send new logs as one batched frame (entries are already JSON-encoded)
+            if new_logs:
+                yield _sse_logs(new_logs)
+            
+            # Send status updates
+            if job["status"] in FINAL_STATUSES:
+                yield _sse({'type': 'status', 'status': job["status"], 'message': job.get("message", "")})
+                break
     
-    return Response(
-        stream_with_context(generate()),
-        mimetype="text/event-stream",
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
@@ -217,23 +272,22 @@ def stream_logs(job_id: str):
     )
 
 
-@app.route("/api/status/<job_id>", methods=["GET"])
+@app.get("/api/status/{job_id}")
 def get_status(job_id: str):
     """Get the status of a render job."""
-    with job_lock:
-        if job_id not in jobs:
-            return jsonify({"error": "Job not found"}), 404
-        
-        job = jobs[job_id]
-        return jsonify({
-            "job_id": job_id,
-            "status": job["status"],
-            "message": job.get("message", ""),
-        })
+    job = job_store.get_job(job_id)
+    if job is None:
+        return _error("Job not found", 404)
+    
+    return JSONResponse({
+        "job_id": job_id,
+        "status": job["status"],
+        "message": job.get("message", ""),
+    })
 
 
-@app.route("/api/health", methods=["GET"])
+@app.get("/api/health")
 def health_check():
     """Health check endpoint."""
-    return jsonify({"status": "ok"}), 200
+    return {"status": "ok"}
 
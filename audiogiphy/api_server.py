@@ -1,13 +1,16 @@
 """
 API Server entry point for AudioGiphy.
 
-Starts the Flask development server for the Vue.js frontend.
+Starts the API server (uvicorn) for the Vue.js frontend.
 """
 
 import logging
 import sys
 from pathlib import Path
 
+import uvicorn
+from fastapi.responses import FileResponse
+
 from audiogiphy.api import app
 
 # Configure logging
@@ -21,19 +24,17 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    """Start the Flask API server."""
+    """Start the API server."""
     # Check if frontend dist exists
     frontend_dist = Path(__file__).parent.parent / "frontend" / "dist"
     if frontend_dist.exists():
         # Serve static files from frontend/dist
-        from flask import send_from_directory
-        
-        @app.route("/", defaults={"path": ""})
-        @app.route("/<path:path>")
-        def serve_frontend(path):
-            if path and (frontend_dist / path).exists():
-                return send_from_directory(str(frontend_dist), path)
-            return send_from_directory(str(frontend_dist), "index.html")
+        @app.get("/{path:path}", include_in_schema=False)
+        def serve_frontend(path: str):
+            file_path = (frontend_dist / path).resolve()
+            if path and file_path.is_relative_to(frontend_dist.resolve()) and file_path.is_file():
+                return FileResponse(file_path)
+            return FileResponse(frontend_dist / "index.html")
         
         logger.info("Serving frontend from frontend/dist")
     else:
@@ -43,11 +44,12 @@ def main():
     logger.info(f"Starting AudioGiphy API server on http://localhost:{port}")
     logger.info("API endpoints:")
     logger.info("  POST   /api/render - Start a render job")
-    logger.info("  GET    /api/logs/<job_id> - Stream logs (SSE)")
-    logger.info("  GET    /api/status/<job_id> - Get job status")
+    logger.info("  GET    /api/logs/{job_id} - Stream logs (SSE)")
+    logger.info("  GET    /api/status/{job_id} - Get job status")
     logger.info("  GET    /api/health - Health check")
     
-    app.run(host="0.0.0.0", port=port, debug=True, threaded=True)
+    # In-flight renders are waited for by the app's lifespan handler on shutdown
+    uvicorn.run(app, host="0.0.0.0", port=port)
 
 
 if __name__ == "__main__":
@@ -6,26 +6,48 @@ over time, creating a timeline that drives video clip speed synchronization.
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List, Tuple
+import functools
 import logging
 
 import librosa
 import numpy as np
+import soundfile
+import soxr
+from joblib import Parallel, delayed
 from pathlib import Path
 from tqdm import tqdm
 
-from audiogiphy.config import BPM_WINDOW_SECONDS, BPM_HOP_SECONDS, DEFAULT_BPM_FALLBACK
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
+from audiogiphy.disk_cache import get_memory
+from audiogiphy.config import (
+    BPM_ANALYSIS_SR,
+    BPM_WINDOW_SECONDS,
+    BPM_HOP_SECONDS,
+    BPM_REUSE_TOLERANCE,
+    DEFAULT_BPM_FALLBACK,
+)
 
 __all__ = [
     "BpmSegment",
     "analyze_bpm_segments",
     "bpm_timeline_from_segments",
+    "global_bpm_from_segments",
     "analyze_bpm_per_second",
     "analyze_global_bpm",
 ]
 
 logger = logging.getLogger("audiogiphy.audio_analysis")
 
+# Bump when the BPM analysis changes in a way that invalidates on-disk results
+_CACHE_VERSION = 1
+
 
 @dataclass
 class BpmSegment:
@@ -42,9 +64,89 @@ class BpmSegment:
     bpm: float
 
 
+def _estimate_window_bpm(
+    onset_env: np.ndarray,
+    rms_win: np.ndarray,
+    sr: int,
+    hop_length: int,
+    min_bpm: float,
+    max_bpm: float,
+) -> float:
+    """
+    Estimate the BPM of a single analysis window.
+
+    Args:
+        onset_env: Slice of the full-track onset envelope for this window
+        rms_win: Slice of the full-track frame RMS for this window
+        sr: Sample rate of the analyzed audio
+        hop_length: Hop length used for the onset envelope and RMS frames
+        min_bpm: Minimum valid BPM value
+        max_bpm: Maximum valid BPM value
+
+    Returns:
+        BPM clipped to [min_bpm, max_bpm], or NaN if the window is silent
+        or has no usable onsets
+    """
+    # Energy check
+    if rms_win.size == 0:
+        return float("nan")
+    rms = float(np.sqrt(np.dot(rms_win, rms_win) / rms_win.size))
+    if rms < 1e-4:
+        return float("nan")
+
+    if onset_env.size < 4 or float(np.sum(onset_env)) < 1e-3:
+        return float("nan")
+
+    tempo = librosa.beat.tempo(
+        onset_envelope=onset_env,
+        sr=sr,
+        hop_length=hop_length,
+        aggregate=np.median,
+    )
+    bpm_val = float(tempo[0]) if tempo.size else float("nan")
+    if not np.isfinite(bpm_val):
+        return float("nan")
+    return float(np.clip(bpm_val, min_bpm, max_bpm))
+
+
+def _find_segment_edges_py(bpm: np.ndarray, change_threshold: float) -> np.ndarray:
+    """
+    Find the window indices where new BPM segments start.
+
+    A new segment starts when a window's BPM moves more than change_threshold
+    away from the first BPM of the current segment. Compiled with Numba when
+    it is available.
+
+    Args:
+        bpm: Per-window BPM values (no NaNs)
+        change_threshold: BPM change threshold to start a new segment
+
+    Returns:
+        Array of segment start indices (always begins with 0 for non-empty input)
+    """
+    edges = np.empty(bpm.size, dtype=np.int64)
+    if bpm.size == 0:
+        return edges
+    edges[0] = 0
+    n_edges = 1
+    current_bpm = bpm[0]
+    for i in range(1, bpm.size):
+        if abs(bpm[i] - current_bpm) > change_threshold:
+            edges[n_edges] = i
+            n_edges += 1
+            current_bpm = bpm[i]
+    return edges[:n_edges]
+
+
+if NUMBA_AVAILABLE:
+    _find_segment_edges = njit(cache=True)(_find_segment_edges_py)
+else:
+    _find_segment_edges = _find_segment_edges_py
+
+
 def analyze_bpm_segments(
     audio_path: str,
-    sr: int | None = None,
+    sr: int | None = BPM_ANALYSIS_SR,
     window_seconds: float = BPM_WINDOW_SECONDS,
     hop_seconds: float = BPM_HOP_SECONDS,
     min_bpm: float = 60.0,
@@ -58,9 +160,16 @@ def analyze_bpm_segments(
     window using librosa's tempo detection. It then groups consecutive windows
     with similar BPM into segments.
     
+    Audio is analyzed at BPM_ANALYSIS_SR (11025 Hz) by default: tempo
+    detection does not need content above ~5kHz, and the 60-180 BPM range
+    is unaffected by the lower rate.
+    
+    Results are cached in memory and on disk, keyed by the file's path,
+    modification time, size, and the analysis parameters.
+    
     Args:
         audio_path: Path to the audio file
-        sr: Sample rate (None to use file's native rate)
+        sr: Sample rate to analyze at (None to use file's native rate)
         window_seconds: Length of analysis window in seconds
         hop_seconds: Step size between windows in seconds
         min_bpm: Minimum valid BPM value
@@ -78,104 +187,357 @@ def analyze_bpm_segments(
     if not path.exists():
         raise FileNotFoundError(f"Audio not found: {audio_path}")
 
-    # Load the whole mix once
-    y, sr_loaded = librosa.load(str(path), sr=sr, mono=True)
-    sr = sr_loaded
-    total_duration = len(y) / sr
+    # Results are memoized per file fingerprint so repeated calls for the same
+    # track (e.g. per-second timeline + global BPM) only analyze it once
+    stat = path.stat()
+    segments = _cached_bpm_segments(
+        str(path.resolve()),
+        stat.st_mtime_ns,
+        stat.st_size,
+        sr,
+        float(window_seconds),
+        float(hop_seconds),
+        float(min_bpm),
+        float(max_bpm),
+        float(change_threshold),
+    )
+    return list(segments)
+
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_bpm_segments(
+    audio_path: str,
+    file_mtime_ns: int,
+    file_size: int,
+    sr: int | None,
+    window_seconds: float,
+    hop_seconds: float,
+    min_bpm: float,
+    max_bpm: float,
+    change_threshold: float,
+) -> Tuple[BpmSegment, ...]:
+    """In-process cache layer on top of the on-disk cache of _compute_bpm_segments."""
+    compute = get_memory().cache(_compute_bpm_segments)
+    return tuple(compute(
+        audio_path,
+        file_mtime_ns,
+        file_size,
+        sr,
+        window_seconds,
+        hop_seconds,
+        min_bpm,
+        max_bpm,
+        change_threshold,
+        reuse_tolerance=BPM_REUSE_TOLERANCE,
+        fallback_bpm=DEFAULT_BPM_FALLBACK,
+        frame_params=_frame_params(sr) if sr else None,
+        cache_version=_CACHE_VERSION,
+    ))
+
+
+def _frame_params(sr: int) -> Tuple[int, int]:
+    """
+    Return (n_fft, hop_length) for analyzing audio at the given sample rate.
+
+    Low analysis rates get a smaller FFT so the window stays around 90ms, and
+    a smaller minimum hop so tempo resolution matches higher rates.
+    """
+    n_fft = 1024 if sr <= 16000 else 2048
+    return n_fft, max(128, int(sr * 0.01))
+
+
+def _stream_blocks(
+    audio_path: str,
+    native_sr: int,
+    sr: int,
+    n_fft: int,
+    hop_length: int,
+    block_length: int,
+) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file into mono float32 blocks of `block_length` frames.
+
+    Like librosa.stream, consecutive blocks overlap by n_fft - hop_length
+    samples so that their un-centered STFT frames line up end to end, and the
+    last block is zero-padded. Unlike librosa.stream, the audio is resampled
+    to `sr` on the way, through a streaming soxr resampler so that there are
+    no discontinuities at block edges.
+
+    Args:
+        audio_path: Path to an audio file readable by libsndfile
+        native_sr: Sample rate of the file
+        sr: Sample rate of the yielded blocks
+        n_fft: FFT window size
+        hop_length: Hop length between frames
+        block_length: Number of frames per block
+
+    Yields:
+        Blocks of n_fft + (block_length - 1) * hop_length samples
+    """
+    block_samples = n_fft + (block_length - 1) * hop_length
+    step = block_length * hop_length
+    read_size = max(1, int(step * native_sr / sr))
+    resampler = soxr.ResampleStream(native_sr, sr, 1, dtype="float32") if sr != native_sr else None
+
+    buf = np.zeros(0, dtype=np.float32)
+    with soundfile.SoundFile(audio_path) as f:
+        last = False
+        while not last:
+            raw = f.read(read_size, dtype="float32", always_2d=True)
+            last = raw.shape[0] < read_size
+            chunk = np.ascontiguousarray(raw.mean(axis=1), dtype=np.float32)
+            if resampler is not None:
+                chunk = resampler.resample_chunk(chunk, last=last)
+            buf = np.concatenate((buf, chunk))
+            while buf.size >= block_samples:
+                yield buf[:block_samples]
+                buf = buf[step:]
+
+    if buf.size:
+        yield np.pad(buf, (0, block_samples - buf.size))
+
+
+def _spectral_features(
+    audio_path: str,
+    sr: int | None,
+    block_length: int = 256,
+) -> Tuple[np.ndarray, np.ndarray, int, int, float]:
+    """
+    Compute the full-track onset envelope and frame RMS of an audio file.
+
+    Files that libsndfile can read are decoded (and resampled) in blocks of
+    `block_length` frames, so only one block of samples and its STFT are in
+    memory at a time. Other formats are loaded whole with librosa.load.
+
+    Args:
+        audio_path: Path to the audio file
+        sr: Sample rate to analyze at (None to use file's native rate)
+        block_length: Number of frames per streamed block
+
+    Returns:
+        Tuple of (onset_env, rms, sr, hop_length, total_duration)
+    """
+    try:
+        info = soundfile.info(audio_path)
+    except RuntimeError:
+        info = None  # Not readable by libsndfile
+
+    if info is not None:
+        sr = sr or info.samplerate
+        total_duration = info.frames / info.samplerate
+        n_fft, hop_length = _frame_params(sr)
+        blocks = _stream_blocks(audio_path, info.samplerate, sr, n_fft, hop_length, block_length)
+    else:
+        y, sr = librosa.load(audio_path, sr=sr, mono=True, dtype=np.float32)
+        total_duration = len(y) / sr
+        n_fft, hop_length = _frame_params(sr)
+        if 0 < y.size < n_fft:
+            y = np.pad(y, (0, n_fft - y.size))
+        blocks = [y] if y.size else []
+
+    # Streamed blocks overlap so that their un-centered frames line up
+    # end to end. Mel power and RMS are per-frame, so they can be computed
+    # block by block; the onset envelope needs neighbouring frames and the
+    # dB scaling is relative to the track maximum, so it is computed once
+    # over the concatenated mel spectrogram.
+    mel_blocks: List[np.ndarray] = []
+    rms_blocks: List[np.ndarray] = []
+    for block in blocks:
+        mag = np.abs(librosa.stft(block, n_fft=n_fft, hop_length=hop_length, center=False))
+        mel_blocks.append(librosa.feature.melspectrogram(S=mag ** 2, sr=sr))
+        rms_blocks.append(librosa.feature.rms(S=mag, frame_length=n_fft, hop_length=hop_length)[0])
+        del mag
+
+    if not mel_blocks:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32), sr, hop_length, total_duration
+
+    mel = np.concatenate(mel_blocks, axis=1)
+    del mel_blocks
+    onset_env = librosa.onset.onset_strength(
+        S=librosa.power_to_db(mel),
+        sr=sr,
+        hop_length=hop_length,
+    )
+    rms = np.concatenate(rms_blocks)
+    return onset_env, rms, sr, hop_length, total_duration
+
+
+def _plan_window_reuse(
+    rms: np.ndarray,
+    onset_env: np.ndarray,
+    window_frames: List[Tuple[int, int]],
+    tolerance: float,
+    max_run: int,
+) -> np.ndarray:
+    """
+    Pick, for each analysis window, the window whose BPM estimate it can reuse.
+
+    A window reuses the previous window's estimate when both its RMS energy
+    and its mean onset strength are within `tolerance` (relative) of the
+    previous window's. At most `max_run` windows in a row reuse the same
+    estimate, so a new estimate is made before windows stop overlapping the
+    estimated one.
+
+    Args:
+        rms: Full-track frame RMS
+        onset_env: Full-track onset envelope
+        window_frames: (start_frame, end_frame) of each window
+        tolerance: Maximum relative change to reuse an estimate
+        max_run: Maximum number of consecutive windows reusing one estimate
+
+    Returns:
+        Array of source window indices (source[i] == i for windows that need
+        their own estimate)
+    """
+    n = len(window_frames)
+    source = np.arange(n)
+    if n < 2 or max_run <= 0:
+        return source
+
+    # Window means from prefix sums of the per-frame features
+    bounds = np.asarray(window_frames, dtype=np.int64)
+    rms_f0 = np.clip(bounds[:, 0], 0, rms.size)
+    rms_f1 = np.clip(bounds[:, 1], 0, rms.size)
+    onset_f0 = np.clip(bounds[:, 0], 0, onset_env.size)
+    onset_f1 = np.clip(bounds[:, 1], 0, onset_env.size)
+    rms_cs = np.concatenate(([0.0], np.cumsum(np.square(rms, dtype=np.float64))))
+    onset_cs = np.concatenate(([0.0], np.cumsum(onset_env, dtype=np.float64)))
+    energy = np.sqrt((rms_cs[rms_f1] - rms_cs[rms_f0]) / np.maximum(rms_f1 - rms_f0, 1))
+    onset_mean = (onset_cs[onset_f1] - onset_cs[onset_f0]) / np.maximum(onset_f1 - onset_f0, 1)
+
+    def relative_change(x: np.ndarray) -> np.ndarray:
+        return np.abs(np.diff(x)) / np.maximum(x[:-1], 1e-6)
+
+    similar = (relative_change(energy) < tolerance) & (relative_change(onset_mean) < tolerance)
+
+    run = 0
+    for i in range(1, n):
+        if similar[i - 1] and run < max_run:
+            source[i] = source[i - 1]
+            run += 1
+        else:
+            run = 0
+    return source
+
+
+def _compute_bpm_segments(
+    audio_path: str,
+    file_mtime_ns: int,
+    file_size: int,
+    sr: int | None,
+    window_seconds: float,
+    hop_seconds: float,
+    min_bpm: float,
+    max_bpm: float,
+    change_threshold: float,
+    reuse_tolerance: float = BPM_REUSE_TOLERANCE,
+    fallback_bpm: float = DEFAULT_BPM_FALLBACK,
+    frame_params: Tuple[int, int] | None = None,
+    cache_version: int = _CACHE_VERSION,
+) -> List[BpmSegment]:
+    """
+    Run the BPM segment analysis for analyze_bpm_segments.
+
+    file_mtime_ns, file_size, frame_params and cache_version are not used in
+    the computation; they are part of the arguments so that the on-disk cache
+    is invalidated when the file, the (n_fft, hop_length) derived from sr, or
+    the analysis code changes.
+    """
+    # Onset envelope and frame RMS for the whole track; windows below just
+    # slice these arrays
+    onset_env_full, rms_full, sr, hop_length, total_duration = _spectral_features(audio_path, sr)
 
     if total_duration <= 0:
         raise ValueError("Audio has zero duration")
 
-    hop_length = max(256, int(sr * 0.01))
+    # A silent track has no tempo; skip the per-window analysis entirely
+    global_rms = float(np.sqrt(np.dot(rms_full, rms_full) / max(rms_full.size, 1)))
+    if global_rms < 1e-4:
+        logger.warning(f"Audio is silent, using default BPM {fallback_bpm}")
+        return [BpmSegment(start=0.0, end=total_duration, bpm=fallback_bpm)]
 
-    window_bpm: List[float] = []
     window_starts: List[float] = []
 
     if hop_seconds <= 0:
         raise ValueError("hop_seconds must be > 0")
     n_steps = int(np.ceil(total_duration / hop_seconds))
-    
-    for i in tqdm(range(n_steps), desc="BPM windows", ncols=80):
+
+    frames_per_sec = sr / hop_length
+
+    # Collect window bounds up front; each window is then independent and
+    # can be estimated in parallel (FFT/autocorrelation work releases the GIL).
+    window_frames: List[Tuple[int, int]] = []
+    for i in range(n_steps):
         start_sec = i * float(hop_seconds)
         end_sec = min(start_sec + float(window_seconds), float(total_duration))
         if end_sec - start_sec < 0.5:
             break  # too short to analyze
 
-        start_idx = int(start_sec * sr)
-        end_idx = int(end_sec * sr)
-        y_win = y[start_idx:end_idx]
-
-        # Energy check
-        if y_win.size == 0:
-            bpm = float("nan")
-        else:
-            rms = float(np.sqrt(np.mean(y_win ** 2))) if y_win.size else 0.0
-            if rms < 1e-4:
-                bpm = float("nan")
-            else:
-                onset_env = librosa.onset.onset_strength(
-                    y=y_win,
-                    sr=sr,
-                    hop_length=hop_length,
-                )
-                if onset_env.size < 4 or float(np.sum(onset_env)) < 1e-3:
-                    bpm = float("nan")
-                else:
-                    tempo = librosa.beat.tempo(
-                        onset_envelope=onset_env,
-                        sr=sr,
-                        hop_length=hop_length,
-                        aggregate=np.median,
-                    )
-                    bpm_val = float(tempo[0]) if tempo.size else float("nan")
-                    if np.isfinite(bpm_val):
-                        bpm = float(np.clip(bpm_val, min_bpm, max_bpm))
-                    else:
-                        bpm = float("nan")
-
         window_starts.append(start_sec)
-        window_bpm.append(bpm)
-
-    # Fill NaNs by forward and backward fill
-    for i in range(1, len(window_bpm)):
-        if not np.isfinite(window_bpm[i]) and np.isfinite(window_bpm[i - 1]):
-            window_bpm[i] = window_bpm[i - 1]
-    for i in range(len(window_bpm) - 2, -1, -1):
-        if not np.isfinite(window_bpm[i]) and np.isfinite(window_bpm[i + 1]):
-            window_bpm[i] = window_bpm[i + 1]
-
-    # If still all NaN, give up with a default
-    finite_bpms = [b for b in window_bpm if np.isfinite(b)]
-    if not finite_bpms:
-        return [BpmSegment(start=0.0, end=total_duration, bpm=DEFAULT_BPM_FALLBACK)]
-
-    # Replace remaining NaNs with global median
-    global_bpm = float(np.median(finite_bpms))
-    window_bpm = [float(global_bpm) if not np.isfinite(b) else float(b) for b in window_bpm]
-
-    # Build segments by grouping windows that have similar BPM
-    segments: List[BpmSegment] = []
-    current_start = window_starts[0]
-    current_bpm = window_bpm[0]
-
-    for i in range(1, len(window_bpm)):
-        this_start = window_starts[i]
-        this_bpm = window_bpm[i]
-        if abs(this_bpm - current_bpm) > change_threshold:
-            segments.append(BpmSegment(start=current_start, end=this_start, bpm=current_bpm))
-            current_start = this_start
-            current_bpm = this_bpm
-
-    # Close final segment at end of track
-    segments.append(BpmSegment(start=current_start, end=total_duration, bpm=current_bpm))
-
-    return segments
+        window_frames.append((int(start_sec * frames_per_sec), int(end_sec * frames_per_sec)))
+
+    def estimate(indices: np.ndarray) -> List[float]:
+        return Parallel(n_jobs=-1, prefer="threads")(
+            delayed(_estimate_window_bpm)(
+                onset_env_full[window_frames[i][0]:window_frames[i][1]],
+                rms_full[window_frames[i][0]:window_frames[i][1]],
+                sr,
+                hop_length,
+                min_bpm,
+                max_bpm,
+            )
+            for i in tqdm(indices.tolist(), desc="BPM windows", ncols=80)
+        )
+
+    # Windows whose energy barely changed from the previous one reuse its BPM
+    # instead of running tempo estimation again
+    max_run = max(0, int(np.ceil(window_seconds / hop_seconds)) - 1)
+    source = _plan_window_reuse(rms_full, onset_env_full, window_frames, reuse_tolerance, max_run)
+    window_idx = np.arange(len(window_frames))
+    estimated = np.flatnonzero(source == window_idx)
+    logger.debug(f"Reusing BPM estimates for {len(window_frames) - estimated.size} of {len(window_frames)} windows")
+
+    bpm_arr = np.full(len(window_frames), np.nan)
+    if estimated.size:
+        bpm_arr[estimated] = estimate(estimated)
+    bpm_arr = bpm_arr[source]
+
+    # Only finite estimates are reused; the rest get their own estimate
+    retry = np.flatnonzero((source != window_idx) & ~np.isfinite(bpm_arr))
+    if retry.size:
+        bpm_arr[retry] = estimate(retry)
+
+    start_arr = np.asarray(window_starts, dtype=np.float64)
+
+    # If every window is NaN, give up with a default
+    finite = np.isfinite(bpm_arr)
+    if not finite.any():
+        return [BpmSegment(start=0.0, end=total_duration, bpm=fallback_bpm)]
+
+    # Fill NaNs by forward fill (index of the last finite window so far),
+    # then backward fill the leading NaNs from the first finite window
+    positions = np.arange(bpm_arr.size)
+    bpm_arr = bpm_arr[np.maximum.accumulate(np.where(finite, positions, 0))]
+    first_finite = int(np.argmax(finite))
+    bpm_arr[:first_finite] = bpm_arr[first_finite]
+
+    # Build segments from boundary indices; the final one closes at end of track
+    edge_arr = _find_segment_edges(bpm_arr, float(change_threshold))
+    seg_starts = start_arr[edge_arr]
+    seg_ends = np.append(start_arr[edge_arr[1:]], total_duration)
+    seg_bpms = bpm_arr[edge_arr]
+
+    return [
+        BpmSegment(start=start, end=end, bpm=bpm)
+        for start, end, bpm in zip(seg_starts.tolist(), seg_ends.tolist(), seg_bpms.tolist())
+    ]
 
 
 def bpm_timeline_from_segments(
     segments: List[BpmSegment],
     duration_seconds: int,
-) -> List[float]:
+) -> np.ndarray:
     """
     Expand a list of BpmSegment objects into a per-second BPM timeline.
     
@@ -188,24 +550,23 @@ def bpm_timeline_from_segments(
         duration_seconds: Total duration of the timeline in seconds
         
     Returns:
-        List of BPM values, one per second, indexed by second number
+        float32 array of BPM values, one per second, indexed by second number
     """
     if not segments:
-        return [DEFAULT_BPM_FALLBACK] * duration_seconds
+        return np.full(duration_seconds, DEFAULT_BPM_FALLBACK, dtype=np.float32)
 
-    bpm_values: List[float] = []
-    for t in range(duration_seconds):
-        time = float(t)
-        bpm_for_t = segments[-1].bpm  # default to last
-        for seg in segments:
-            if seg.start <= time < seg.end:
-                bpm_for_t = seg.bpm
-                break
-        bpm_values.append(float(bpm_for_t))
-    return bpm_values
+    # Segments are contiguous and sorted by start, so the segment covering
+    # second t is the last one whose start <= t. Seconds past the final
+    # start fall through to the last segment.
+    starts = np.fromiter((seg.start for seg in segments), dtype=np.float64, count=len(segments))
+    bpms = np.fromiter((seg.bpm for seg in segments), dtype=np.float64, count=len(segments))
+    t = np.arange(duration_seconds, dtype=np.float64)
+    idx = np.searchsorted(starts, t, side="right") - 1
+    idx = np.clip(idx, 0, len(segments) - 1)
+    return bpms[idx].astype(np.float32)
 
 
-def analyze_bpm_per_second(audio_path: str, duration_seconds: int) -> List[float]:
+def analyze_bpm_per_second(audio_path: str, duration_seconds: int) -> np.ndarray:
     """
     Analyze audio and return a per-second BPM timeline.
     
@@ -217,7 +578,7 @@ def analyze_bpm_per_second(audio_path: str, duration_seconds: int) -> List[float
         duration_seconds: Duration of the output video in seconds
         
     Returns:
-        List of BPM values, one per second
+        float32 array of BPM values, one per second
         
     Usage:
         Used in the render pipeline to get BPM values for each second
@@ -248,17 +609,27 @@ def analyze_global_bpm(audio_path: str, duration_seconds: int) -> float:
         Used in the render pipeline as the reference BPM. Local BPM values
         are divided by this base to determine speed multipliers for clips.
     """
-    segments = analyze_bpm_segments(audio_path)
+    return global_bpm_from_segments(analyze_bpm_segments(audio_path))
+
+
+def global_bpm_from_segments(segments: List[BpmSegment]) -> float:
+    """
+    Return the length-weighted median BPM of a list of BpmSegment objects.
+    
+    Args:
+        segments: List of BpmSegment objects from analyze_bpm_segments
+        
+    Returns:
+        Weighted median BPM, or DEFAULT_BPM_FALLBACK if there are no segments
+    """
     if not segments:
         return DEFAULT_BPM_FALLBACK
     
-    # Weighted median by segment length
-    bpms = []
-    weights = []
-    for s in segments:
-        bpms.append(s.bpm)
-        weights.append(max(0.1, s.end - s.start))
-    w = np.array(weights) / np.sum(weights)
-    # Approximate weighted median by picking BPM of max weight
-    return float(bpms[int(np.argmax(w))])
-
+    # Weighted median by segment length: sort by BPM and take the value where
+    # the cumulative weight first reaches half of the total
+    bpms = np.array([s.bpm for s in segments], dtype=np.float64)
+    weights = np.array([max(0.1, s.end - s.start) for s in segments], dtype=np.float64)
+    order = np.argsort(bpms)
+    cumulative = np.cumsum(weights[order])
+    median_idx = int(np.searchsorted(cumulative, cumulative[-1] * 0.5))
+    return float(bpms[order][median_idx])
@@ -6,54 +6,65 @@ and detecting lyrics from audio files.
 """
 
 import argparse
+import functools
 import sys
 import logging
-import subprocess
 import json
+import os
+import shutil
+import stat
 from pathlib import Path
 
-from audiogiphy.render_pipeline import render_video
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from audiogiphy.config import DEFAULT_RESOLUTION
 
 __all__ = ["main"]
 
 # Configure logging with simple tags
-class ModuleFormatter(logging.Formatter):
-    """Custom formatter that extracts module name from logger name."""
-    def format(self, record):
-        # Extract module name from logger name (e.g., "audiogiphy.audio_analysis" -> "audio")
-        logger_name = record.name
-        # Special handling for ffmpeg logger
-        if logger_name == 'ffmpeg':
-            record.name = 'ffmpeg'
-        elif logger_name.startswith('audiogiphy.'):
-            module = logger_name.split('.')[-1]
-            # Map module names to simple tags
-            tag_map = {
-                'audio_analysis': 'audio',
-                'visual_builder': 'visual',
-                'render_pipeline': 'render',
-                'giphy_placeholder': 'giphy',
-                'cli': 'cli',
-                'lyrics_analysis': 'lyrics',
-            }
-            record.name = tag_map.get(module, module)
-        return super().format(record)
+# Module name -> short tag shown in log output
+# (e.g. "audiogiphy.audio_analysis" -> "audio")
+MODULE_TAGS = {
+    'audio_analysis': 'audio',
+    'visual_builder': 'visual',
+    'render_pipeline': 'render',
+    'giphy_client': 'giphy',
+    'cli': 'cli',
+    'lyrics_analysis': 'lyrics',
+}
+
+
+class ModuleTagFilter(logging.Filter):
+    """Handler filter that replaces a record's logger name with its short module tag."""
+    def __init__(self):
+        super().__init__()
+        self._tags: dict[str, str] = {}  # Logger name -> tag, computed once per logger
+    
+    def filter(self, record):
+        tag = self._tags.get(record.name)
+        if tag is None:
+            tag = record.name
+            if tag.startswith('audiogiphy.'):
+                module = tag.rsplit('.', 1)[-1]
+                tag = MODULE_TAGS.get(module, module)
+            self._tags[record.name] = tag
+        record.name = tag
+        return True
 
 handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(ModuleFormatter("[%(name)s] %(message)s"))
+handler.addFilter(ModuleTagFilter())
+handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
 logging.basicConfig(level=logging.INFO, handlers=[handler])
 
 logger = logging.getLogger("audiogiphy.cli")
 
 
-def parse_args() -> argparse.Namespace:
-    """
-    Parse command-line arguments.
-    
-    Returns:
-        Namespace object with parsed arguments
-    """
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser (once per process)."""
     parser = argparse.ArgumentParser(
         description="AudioGiphy - BPM-driven video visualizer and lyric detector",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -199,18 +210,31 @@ Examples:
         help="Optional prompt to guide transcription (e.g., 'Glamorous by Fergie feat Ludacris')"
     )
     
-    return parser.parse_args()
+    return parser
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+    
+    Args:
+        argv: Arguments to parse (default: sys.argv[1:])
+    
+    Returns:
+        Namespace object with parsed arguments
+    """
+    return _build_parser().parse_args(argv)
+
+
+@functools.lru_cache(maxsize=1)
 def check_ffmpeg() -> None:
-    """Check if ffmpeg is installed and available."""
-    try:
-        subprocess.run(
-            ["ffmpeg", "-version"],
-            capture_output=True,
-            check=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    """
+    Check if ffmpeg is installed and available.
+    
+    Only looks the executable up on PATH (no process is spawned); a
+    successful check is cached for the rest of the process.
+    """
+    if shutil.which("ffmpeg") is None:
         raise RuntimeError(
             "ffmpeg is not installed or not found in PATH. "
             "Please install ffmpeg to use AudioGiphy.\n"
@@ -220,24 +244,31 @@ def check_ffmpeg() -> None:
 
 def validate_paths(audio_path: str, video_folder: str = None) -> None:
     """Validate that required paths exist."""
-    audio_file = Path(audio_path)
-    if not audio_file.exists():
+    if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
     
     if video_folder is not None:
-        video_dir = Path(video_folder)
-        if not video_dir.exists():
+        try:
+            folder_stat = os.stat(video_folder)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Video folder not found: {video_folder}")
         
-        if not video_dir.is_dir():
+        if not stat.S_ISDIR(folder_stat.st_mode):
             raise ValueError(f"Video folder path is not a directory: {video_folder}")
         
-        # Check for MP4 files
-        mp4_files = list(video_dir.glob("*.mp4"))
-        if not mp4_files:
+        # Check for MP4 files (stops at the first one found)
+        with os.scandir(video_folder) as entries:
+            has_mp4 = any(entry.name.endswith(".mp4") and entry.is_file() for entry in entries)
+        if not has_mp4:
             raise ValueError(f"No MP4 files found in video folder: {video_folder}")
 
 
+# Fixed pieces of the lyrics report, built once at import
+_HR_EQ = "=" * 70 + "\n"
+_HR_DASH = "-" * 70 + "\n"
+_WORD_HEADER = f"{'Start (s)':<12} {'End (s)':<12} {'Word'}\n"
+
+
 def format_lyrics_output(result, output_path: str = None) -> None:
     """
     Format and output lyrics detection results.
@@ -246,29 +277,28 @@ def format_lyrics_output(result, output_path: str = None) -> None:
         result: LyricsResult object
         output_path: Optional path to write output file (JSON or .txt)
     """
-    # Print header
-    print("\n" + "=" * 70)
-    print("LYRICS DETECTION RESULTS")
-    print("=" * 70)
-    print(f"Audio duration: {result.duration:.2f} seconds")
-    print(f"Detected language: {result.language}")
-    print(f"Total words: {len(result.words)}")
-    print("=" * 70)
-    
-    # Print full transcript
-    print("\nFULL TRANSCRIPT:")
-    print("-" * 70)
-    print(result.transcript)
-    print("-" * 70)
-    
-    # Print word-level timestamps
-    print("\nWORD TIMESTAMPS:")
-    print("-" * 70)
-    print(f"{'Start (s)':<12} {'End (s)':<12} {'Word'}")
-    print("-" * 70)
-    for word in result.words:
-        print(f"{word.start:<12.3f} {word.end:<12.3f} {word.word}")
-    print("-" * 70)
+    # Build the whole report once; it is printed and optionally written to a
+    # text file in a single write each
+    word_lines = [f"{word.start:<12.3f} {word.end:<12.3f} {word.word}\n" for word in result.words]
+    report = "".join([
+        "LYRICS DETECTION RESULTS\n",
+        _HR_EQ,
+        f"Audio duration: {result.duration:.2f} seconds\n",
+        f"Detected language: {result.language}\n",
+        f"Total words: {len(result.words)}\n",
+        _HR_EQ,
+        "\nFULL TRANSCRIPT:\n",
+        _HR_DASH,
+        result.transcript + "\n",
+        _HR_DASH,
+        "\nWORD TIMESTAMPS:\n",
+        _HR_DASH,
+        _WORD_HEADER,
+        _HR_DASH,
+        *word_lines,
+        _HR_DASH,
+    ])
+    sys.stdout.write("\n" + _HR_EQ + report)
     
     # Write to file if requested
     if output_path:
@@ -277,53 +307,51 @@ def format_lyrics_output(result, output_path: str = None) -> None:
         
         if output_file.suffix.lower() == ".json":
             # JSON output
-            json_data = {
-                "transcript": result.transcript,
-                "language": result.language,
-                "duration": result.duration,
-                "words": [
-                    {
-                        "word": word.word,
-                        "start": word.start,
-                        "end": word.end,
-                    }
-                    for word in result.words
-                ],
-            }
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # orjson serializes the LyricWord dataclasses directly, so no
+                # per-word dict list is built before encoding
+                json_data = {
+                    "transcript": result.transcript,
+                    "language": result.language,
+                    "duration": result.duration,
+                    "words": result.words,
+                }
+                with open(output_file, "wb") as f:
+                    f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+            else:
+                json_data = {
+                    "transcript": result.transcript,
+                    "language": result.language,
+                    "duration": result.duration,
+                    "words": [
+                        {
+                            "word": word.word,
+                            "start": word.start,
+                            "end": word.end,
+                        }
+                        for word in result.words
+                    ],
+                }
+                with open(output_file, "w", encoding="utf-8") as f:
+                    json.dump(json_data, f, indent=2, ensure_ascii=False)
             print(f"\n✓ Results saved to JSON: {output_path}")
         else:
             # Plain text output
             with open(output_file, "w", encoding="utf-8") as f:
-                f.write("LYRICS DETECTION RESULTS\n")
-                f.write("=" * 70 + "\n")
-                f.write(f"Audio duration: {result.duration:.2f} seconds\n")
-                f.write(f"Detected language: {result.language}\n")
-                f.write(f"Total words: {len(result.words)}\n")
-                f.write("=" * 70 + "\n\n")
-                f.write("FULL TRANSCRIPT:\n")
-                f.write("-" * 70 + "\n")
-                f.write(result.transcript + "\n")
-                f.write("-" * 70 + "\n\n")
-                f.write("WORD TIMESTAMPS:\n")
-                f.write("-" * 70 + "\n")
-                f.write(f"{'Start (s)':<12} {'End (s)':<12} {'Word'}\n")
-                f.write("-" * 70 + "\n")
-                for word in result.words:
-                    f.write(f"{word.start:<12.3f} {word.end:<12.3f} {word.word}\n")
-                f.write("-" * 70 + "\n")
+                f.write(report)
             print(f"\n✓ Results saved to text file: {output_path}")
 
 
 def handle_render_command(args) -> None:
     """Handle the render subcommand."""
+    from audiogiphy.render_pipeline import render_video
+    
     logger.info("AudioGiphy MVP - Starting render")
-    logger.info(f"Audio: {args.audio}")
-    logger.info(f"Video folder: {args.gif_folder}")
-    logger.info(f"Duration: {args.duration_seconds}s")
-    logger.info(f"Output: {args.output}")
-    logger.info(f"Resolution: {args.width}x{args.height}")
+    logger.info("Audio: %s", args.audio)
+    logger.info("Video folder: %s", args.gif_folder)
+    logger.info("Duration: %ss", args.duration_seconds)
+    logger.info("Output: %s", args.output)
+    logger.info("Resolution: %sx%s", args.width, args.height)
     
     # Validate prerequisites
     logger.info("Validating prerequisites")
@@ -360,7 +388,7 @@ def handle_detect_lyrics_command(args) -> None:
     from audiogiphy.lyrics_analysis import detect_lyrics
     
     logger.info("Starting lyrics detection")
-    logger.info(f"Audio: {args.audio}")
+    logger.info("Audio: %s", args.audio)
     
     validate_paths(args.audio)
     
@@ -388,14 +416,14 @@ def main() -> None:
         elif args.command == "detect-lyrics":
             handle_detect_lyrics_command(args)
         else:
-            logger.error(f"Unknown command: {args.command}")
+            logger.error("Unknown command: %s", args.command)
             sys.exit(1)
         
     except KeyboardInterrupt:
         logger.info("\nInterrupted by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"ERROR: {repr(e)}", exc_info=True)
+        logger.error("ERROR: %r", e, exc_info=True)
         sys.exit(1)
 
 
@@ -5,33 +5,47 @@ This module centralizes all configuration values and constants used across
 the codebase, eliminating magic numbers and duplicate definitions.
 """
 
-from pathlib import Path
-from typing import Tuple
+from dataclasses import make_dataclass
 
 # Paths (relative to project root)
 CHECKPOINTS_DIR = "checkpoints"
 
 # Video defaults
 DEFAULT_FPS = 30
-DEFAULT_RESOLUTION: Tuple[int, int] = (1080, 1920)  # width, height
+DEFAULT_RESOLUTION: tuple[int, int] = (1080, 1920)  # width, height
 CLIP_DURATION_SECONDS = 1.0
 
 # Audio analysis defaults
+BPM_ANALYSIS_SR = 11025  # Sample rate for BPM analysis (tempo detection needs nothing above ~5kHz)
 BPM_WINDOW_SECONDS = 8.0
 BPM_HOP_SECONDS = 4.0
+BPM_REUSE_TOLERANCE = 0.02  # Reuse the previous window's BPM when energy changes less than this (relative)
 DEFAULT_BPM_FALLBACK = 120.0
 
 # Visual builder defaults
 BASE_WINDOW_SECONDS = 1.2  # For extracting subclips from source videos
 CHECKPOINT_INTERVAL = 50  # Save checkpoint every N seconds
+CHECKPOINT_COMPACT_INTERVAL = 500  # Rewrite the full clip list every N seconds (concat_list.txt logs clips in between)
+CLIP_X264_PRESET = "ultrafast"  # x264 preset for the 1-second clips (re-encoded once more in the final pass)
+VISUAL_BUILD_WORKERS = 0  # Processes rendering 1-second clips in parallel (0 = CPU count / VISUAL_ENCODER_THREADS)
+VISUAL_PROBE_THREADS = 8  # Concurrent header probes of bank videos before rendering
+VISUAL_ENCODER_THREADS = 2  # Target ffmpeg threads per clip encode when sizing the worker pool (actual: CPU count / workers, 1-4)
+FINAL_X264_PRESET = "veryfast"  # x264 preset for the final watermark overlay pass
+FINAL_X264_CRF = 18  # x264 quality for the final pass (lower = better quality, larger file)
+FINAL_USE_NVENC = False  # Encode the final pass with h264_nvenc when ffmpeg has it (opt-in, needs an NVIDIA GPU)
 
 # Lyrics analysis defaults
+WHISPER_BACKEND = "faster"  # "faster" (faster-whisper, int8) or "openai"; falls back to openai-whisper if faster-whisper is missing
+WHISPER_BATCH_SIZE = 16  # 30-second clips per batched inference pass (faster-whisper only)
 WHISPER_MODEL_SIZE = "large"  # Options: tiny, base, small, medium, large (large = highest accuracy, slower)
 WHISPER_DEFAULT_LANGUAGE = "en"  # English
 WHISPER_TEMPERATURE = 0.0  # More deterministic, less random (0.0 = most deterministic)
 WHISPER_COMPRESSION_RATIO_THRESHOLD = 2.4  # Filter out hallucinations (lower = stricter)
 WHISPER_LOGPROB_THRESHOLD = -1.0  # Filter low-confidence words (lower = stricter)
 WHISPER_NO_SPEECH_THRESHOLD = 0.6  # Better for music with beats (lower = more sensitive)
+WHISPER_VAD_FILTER = True  # Skip instrumental/silent stretches with Silero VAD before transcribing
+WHISPER_VAD_MIN_SILENCE_MS = 500  # Silence needed to split speech regions (ms)
+WHISPER_TORCH_COMPILE = False  # torch.compile the openai-whisper decoder on CUDA (slow first run, faster after)
 
 # Lyrics overlay defaults
 LYRICS_FONT_SIZE = 120  # Font size for lyric overlays (large, centered, not cropped)
@@ -50,8 +64,27 @@ WATERMARK_OPACITY = 0.8  # Watermark opacity (0.0 = transparent, 1.0 = opaque, 0
 WATERMARK_MARGIN_RIGHT = 20  # Margin from right edge in pixels
 WATERMARK_MARGIN_BOTTOM = 20  # Margin from bottom edge in pixels
 
+# API server defaults
+API_RENDER_WORKERS = 2  # Max renders running concurrently (override with AUDIOGIPHY_WORKERS)
+API_MAX_QUEUED_JOBS = 8  # Max renders waiting for a worker before returning HTTP 429
+API_MAX_JOB_LOGS = 1000  # Most recent log lines kept per job
+
+# GIPHY search cache (stored under CHECKPOINTS_DIR)
+GIPHY_CACHE_FILE = "giphy_cache.sqlite"
+GIPHY_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # Re-query GIPHY after a week
+GIPHY_MAX_PARALLEL_SEARCHES = 8  # Concurrent GIPHY requests when searching several queries
+
 # GIPHY overlay defaults
 GIPHY_OVERLAY_SIZE_RATIO = 0.3  # Size of GIPHY overlay as ratio of frame width (30% of width)
 GIPHY_OVERLAY_POSITION = "bottom-right"  # Position: "bottom-right", "bottom-left", "top-right", "top-left", "center"
 GIPHY_OVERLAY_MARGIN = 20  # Margin from edges in pixels
 
+
+# Read-only view of all constants above, e.g. CFG.DEFAULT_FPS. It is a frozen,
+# slotted dataclass instance, so values can't be reassigned at runtime.
+CFG = make_dataclass(
+    "_Config",
+    [(name, type(value), value) for name, value in globals().items() if name.isupper()],
+    frozen=True,
+    slots=True,
+)()
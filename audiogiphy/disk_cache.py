@@ -0,0 +1,29 @@
+"""
+Disk Cache Module.
+
+This module provides the joblib on-disk cache shared by the BPM analysis and
+lyrics transcription, so both keep their results in the same location.
+"""
+
+import functools
+import os
+import tempfile
+
+from joblib import Memory
+
+__all__ = ["get_memory"]
+
+
+@functools.lru_cache(maxsize=None)
+def get_memory() -> Memory:
+    """
+    Return the on-disk cache for analysis results.
+    
+    The location can be overridden with the AUDIOGIPHY_CACHE environment
+    variable. Otherwise /dev/shm is preferred (RAM-backed) when available.
+    """
+    location = os.environ.get("AUDIOGIPHY_CACHE")
+    if not location:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        location = os.path.join(base, "audiogiphy")
+    return Memory(location=location, verbose=0)
@@ -3,21 +3,40 @@ GIPHY API Client Module.
 
 This module provides a client for interacting with the GIPHY Search API.
 It handles API key management, request caching, and error handling.
+Search results are cached in memory and in a SQLite file under the
+checkpoints directory, so repeated renders don't re-query GIPHY.
 """
 
+import json
 import os
 import logging
-from typing import List
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     requests = None
 
+from audiogiphy.config import (
+    CHECKPOINTS_DIR,
+    GIPHY_CACHE_FILE,
+    GIPHY_CACHE_TTL_SECONDS,
+    GIPHY_MAX_PARALLEL_SEARCHES,
+)
+
 __all__ = ["GiphyClient", "search_gifs"]
 
 logger = logging.getLogger("audiogiphy.giphy_client")
 
+GIPHY_SEARCH_URL = "https://api.giphy.com/v1/gifs/search"
+
 
 class GiphyClient:
     """
@@ -25,22 +44,38 @@ class GiphyClient:
     
     Handles API authentication, request caching, and error handling.
     API key is read from GIPHY_API_KEY environment variable.
+    
+    Requests share one HTTP session so connections are kept alive between
+    searches. Use the client as a context manager (or call close()) to
+    release the session and cache file.
     """
     
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        cache_path: str | Path | None = None,
+        cache_ttl: float = GIPHY_CACHE_TTL_SECONDS,
+    ):
         """
         Initialize GIPHY client.
         
         Args:
             api_key: GIPHY API key. If None, reads from GIPHY_API_KEY env var.
                     If still None, client operates in placeholder mode.
+            cache_path: SQLite file for the on-disk search cache
+                    (default: CHECKPOINTS_DIR/GIPHY_CACHE_FILE)
+            cache_ttl: Seconds before an on-disk cache entry is re-queried
         """
         if api_key is None:
             api_key = os.getenv("GIPHY_API_KEY")
         
         self.api_key = api_key
         self.placeholder_mode = api_key is None or api_key == ""
-        self._cache: dict[str, List[str]] = {}  # query -> list of URLs
+        self.cache_ttl = cache_ttl
+        self._cache: dict[str, List[str]] = {}  # cache key -> list of URLs
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self.session = None
         
         if requests is None:
             logger.warning("requests library not installed. GIPHY client will operate in placeholder mode.")
@@ -50,14 +85,102 @@ class GiphyClient:
             logger.info("GiphyClient is in placeholder mode (no API key provided)")
         else:
             # Only log partial key for debugging (first 8 chars)
-            logger.info(f"GiphyClient initialized with API key: {api_key[:8]}...")
+            logger.info("GiphyClient initialized with API key: %s...", api_key[:8])
+            if cache_path is None:
+                cache_path = Path(CHECKPOINTS_DIR) / GIPHY_CACHE_FILE
+            self._db = self._open_disk_cache(Path(cache_path))
+            self.session = self._create_session(api_key)
+    
+    @staticmethod
+    def _create_session(api_key: str) -> "requests.Session":
+        """Create a keep-alive HTTP session with retries for transient errors."""
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        session.params = {"api_key": api_key}
+        return session
+    
+    def close(self) -> None:
+        """Close the HTTP session and the on-disk cache."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+    
+    def __enter__(self) -> "GiphyClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    @staticmethod
+    def _open_disk_cache(cache_path: Path) -> Optional[sqlite3.Connection]:
+        """Open (creating if needed) the on-disk search cache, or None if unavailable."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(cache_path), check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, urls TEXT NOT NULL, ts INTEGER NOT NULL)")
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Could not open GIPHY cache at %s, caching in memory only: %s", cache_path, e)
+            return None
+    
+    def _disk_cache_get(self, cache_key: str) -> Optional[List[str]]:
+        """Return cached URLs for a key if present and not expired."""
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT urls, ts FROM kv WHERE key = ?", (cache_key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("GIPHY cache read failed: %s", e)
+            return None
+        if row is None or time.time() - row[1] >= self.cache_ttl:
+            return None
+        return json.loads(row[0])
+    
+    def _disk_cache_put(self, cache_key: str, urls: List[str]) -> None:
+        """Store URLs for a key in the on-disk cache."""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO kv (key, urls, ts) VALUES (?, ?, ?)",
+                    (cache_key, json.dumps(urls), int(time.time())),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning("GIPHY cache write failed: %s", e)
+    
+    @staticmethod
+    def _cache_key(query: str, limit: int, rating: str, lang: str) -> str:
+        """Cache key for a search (query normalized to lowercase, stripped)."""
+        return f"{query.lower().strip()}|{limit}|{rating}|{lang}"
+    
+    def _cache_get(self, cache_key: str, query: str) -> Optional[List[str]]:
+        """Return cached URLs from memory, then disk, or None on a miss."""
+        if cache_key in self._cache:
+            logger.debug("Cache hit for query: '%s'", query)
+            return self._cache[cache_key]
+        
+        cached_urls = self._disk_cache_get(cache_key)
+        if cached_urls is not None:
+            logger.debug("Disk cache hit for query: '%s'", query)
+            self._cache[cache_key] = cached_urls
+        return cached_urls
     
     def search_gifs(self, query: str, limit: int = 25, rating: str = "g", lang: str = "en") -> List[str]:
         """
         Search for GIFs using GIPHY Search API.
         
-        Results are cached in memory for the duration of the client instance.
-        Repeated calls with the same query return cached results.
+        Results are cached in memory for the duration of the client instance
+        and on disk for `cache_ttl` seconds. Repeated calls with the same query
+        and parameters return cached results.
         
         Args:
             query: Search query string
@@ -72,34 +195,31 @@ class GiphyClient:
             - No results found
         """
         if self.placeholder_mode:
-            logger.debug(f"Placeholder mode: would search for '{query}' (limit={limit})")
+            logger.debug("Placeholder mode: would search for '%s' (limit=%s)", query, limit)
             return []
         
-        if requests is None:
-            logger.warning("requests library not available, cannot make GIPHY API calls")
+        if self.session is None:
+            logger.warning("GIPHY client is closed or requests is not available, cannot make GIPHY API calls")
             return []
         
-        # Normalize query for cache key (lowercase, stripped)
-        cache_key = query.lower().strip()
+        cache_key = self._cache_key(query, limit, rating, lang)
         
-        # Check cache first
-        if cache_key in self._cache:
-            logger.debug(f"Cache hit for query: '{query}'")
-            return self._cache[cache_key]
+        # Check cache first (memory, then disk)
+        cached_urls = self._cache_get(cache_key, query)
+        if cached_urls is not None:
+            return cached_urls
         
         # Make API request
         try:
-            url = "https://api.giphy.com/v1/gifs/search"
             params = {
-                "api_key": self.api_key,
                 "q": query,
                 "limit": limit,
                 "rating": rating,
                 "lang": lang,
             }
             
-            logger.info(f"Searching GIPHY for: '{query}' (limit={limit})")
-            response = requests.get(url, params=params, timeout=10)
+            logger.info("Searching GIPHY for: '%s' (limit=%s)", query, limit)
+            response = self.session.get(GIPHY_SEARCH_URL, params=params, timeout=10)
             response.raise_for_status()
             
             # Parse response
@@ -123,19 +243,78 @@ class GiphyClient:
             
             # Cache results
             self._cache[cache_key] = mp4_urls
+            self._disk_cache_put(cache_key, mp4_urls)
             
-            logger.info(f"Found {len(mp4_urls)} GIFs for query '{query}'")
+            logger.info("Found %d GIFs for query '%s'", len(mp4_urls), query)
             return mp4_urls
             
         except requests.exceptions.RequestException as e:
-            logger.warning(f"GIPHY API request failed for query '{query}': {e}")
+            logger.warning("GIPHY API request failed for query '%s': %s", query, e)
             return []
         except (KeyError, ValueError, TypeError) as e:
-            logger.warning(f"Failed to parse GIPHY API response for query '{query}': {e}")
+            logger.warning("Failed to parse GIPHY API response for query '%s': %s", query, e)
             return []
         except Exception as e:
-            logger.error(f"Unexpected error during GIPHY search for query '{query}': {e}", exc_info=True)
+            logger.error("Unexpected error during GIPHY search for query '%s': %s", query, e, exc_info=True)
             return []
+    
+    def search_gifs_batch(
+        self,
+        queries: Iterable[str],
+        limit: int = 25,
+        rating: str = "g",
+        lang: str = "en",
+    ) -> Dict[str, List[str]]:
+        """
+        Search for several queries at once.
+        
+        Queries that normalize to the same cache key are searched once. Cached
+        results are returned directly; only uncached searches go to a thread
+        pool, running concurrently (up to GIPHY_MAX_PARALLEL_SEARCHES at a
+        time) over the shared session.
+        
+        Args:
+            queries: Search query strings
+            limit: Maximum number of results per query (default: 25)
+            rating: Content rating (default: "g" for general audience)
+            lang: Language code (default: "en")
+            
+        Returns:
+            Dictionary mapping each query (in input order) to its list of MP4 URLs
+        """
+        queries = list(dict.fromkeys(queries))
+        
+        # One search per normalized query
+        unique: Dict[str, str] = {}
+        for query in queries:
+            unique.setdefault(query.lower().strip(), query)
+        
+        def search(query: str) -> List[str]:
+            return self.search_gifs(query, limit=limit, rating=rating, lang=lang)
+        
+        # Only network requests are worth a thread; cache hits (and placeholder
+        # mode, which never makes requests) are answered inline
+        results: Dict[str, List[str]] = {}
+        misses: Dict[str, str] = {}
+        for normalized, query in unique.items():
+            if self.session is None:
+                results[normalized] = search(query)
+                continue
+            cached_urls = self._cache_get(self._cache_key(query, limit, rating, lang), query)
+            if cached_urls is not None:
+                results[normalized] = cached_urls
+            else:
+                misses[normalized] = query
+        
+        if len(misses) == 1:
+            (normalized, query), = misses.items()
+            results[normalized] = search(query)
+        elif misses:
+            workers = min(GIPHY_MAX_PARALLEL_SEARCHES, len(misses))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="giphy") as executor:
+                results.update(zip(misses, executor.map(search, misses.values())))
+        
+        return {query: results[query.lower().strip()] for query in queries}
 
 
 def search_gifs(query: str, limit: int = 25) -> List[str]:
@@ -154,6 +333,6 @@ def search_gifs(query: str, limit: int = 25) -> List[str]:
     Returns:
         List of MP4 URLs from GIPHY
     """
-    client = GiphyClient()
-    return client.search_gifs(query, limit=limit)
+    with GiphyClient() as client:
+        return client.search_gifs(query, limit=limit)
 
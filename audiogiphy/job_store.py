@@ -0,0 +1,405 @@
+"""
+Job Store Module.
+
+This module holds render job state (status, message, captured log lines) for
+the API server. The in-memory store only works within a single process; the
+Redis store shares jobs between processes so the API can run under a
+multi-worker server (e.g. uvicorn --workers N), where the worker that receives
+a log stream request is not necessarily the one running the render.
+
+Log lines are stored as opaque bytes entries. The API stores them already
+JSON-encoded so log streams can splice them into SSE frames as-is.
+
+The backend is chosen with the AUDIOGIPHY_JOB_STORE environment variable
+("memory" or "redis").
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:
+    redis = None
+
+from audiogiphy.config import API_MAX_JOB_LOGS
+
+__all__ = [
+    "JobStore",
+    "InMemoryJobStore",
+    "RedisJobStore",
+    "create_job_store",
+    "FINAL_STATUSES",
+]
+
+# Job statuses after which no more logs or status changes are expected
+FINAL_STATUSES = ("complete", "error")
+
+
+class JobStore:
+    """
+    Interface for render job state storage.
+
+    Log offsets count every line ever appended to a job, so a stream can keep
+    its position even after old lines have been dropped from the bounded log.
+    """
+
+    def create_job(self, job_id: str, params: Dict[str, Any], max_queued: Optional[int] = None) -> bool:
+        """
+        Register a new job in the "queued" state.
+
+        When `max_queued` is given, the job is only created if fewer than that
+        many jobs are queued; the check and the insert happen atomically.
+
+        Returns:
+            True if the job was created, False if the queue was full
+        """
+        raise NotImplementedError
+
+    def update_job(self, job_id: str, status: str, message: Optional[str] = None) -> None:
+        """Set a job's status (and optionally its message)."""
+        raise NotImplementedError
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return {"status", "message", "params"} for a job, or None if unknown."""
+        raise NotImplementedError
+
+    def count_jobs(self, status: str) -> int:
+        """Return the number of jobs currently in the given status."""
+        raise NotImplementedError
+
+    def append_log(self, job_id: str, entry: bytes) -> None:
+        """Append a pre-encoded log entry to a job."""
+        raise NotImplementedError
+
+    def get_logs_since(self, job_id: str, offset: int) -> Tuple[List[bytes], int]:
+        """
+        Return log entries appended after `offset` and the new offset.
+
+        Lines that were already dropped from the bounded log are skipped.
+        """
+        raise NotImplementedError
+
+    def wait_for_update(self, job_id: str, offset: int, timeout: float) -> bool:
+        """
+        Block until the job has logs past `offset`, finishes, or disappears.
+
+        Returns:
+            True if there is something to read, False if the timeout expired
+        """
+        raise NotImplementedError
+
+    async def wait_for_update_async(self, job_id: str, offset: int, timeout: float) -> bool:
+        """
+        Async version of wait_for_update for ASGI log streams.
+
+        The default runs wait_for_update in a worker thread; stores override it
+        to wait without holding a thread.
+        """
+        return await asyncio.to_thread(self.wait_for_update, job_id, offset, timeout)
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Single-process job store backed by dicts and bounded deques.
+
+    The store-wide lock only guards job status. Log entries are stored as
+    (sequence number, entry) pairs and read without any lock, since
+    deque.append and deque.copy are atomic under the GIL. Appends take a
+    per-job lock so that sequence numbers stay in order; only threads
+    logging to the same job share it.
+
+    Readers waiting in wait_for_update are woken through a per-job
+    threading.Condition, and async readers through an asyncio.Event set on
+    their own event loop, so idle streams do not poll.
+    """
+
+    def __init__(self, max_logs: int = API_MAX_JOB_LOGS):
+        self.max_logs = max_logs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._logs: Dict[str, deque] = {}
+        self._log_counts: Dict[str, int] = {}  # Total lines ever appended per job
+        self._log_locks: Dict[str, threading.Lock] = {}
+        self._conds: Dict[str, threading.Condition] = {}
+        self._async_waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def _notify(self, job_id: str) -> None:
+        """Wake up any readers waiting on a job."""
+        cond = self._conds.get(job_id)
+        if cond is not None:
+            with cond:
+                cond.notify_all()
+        for loop, event in list(self._async_waiters.get(job_id, ())):
+            loop.call_soon_threadsafe(event.set)
+
+    def create_job(self, job_id: str, params: Dict[str, Any], max_queued: Optional[int] = None) -> bool:
+        with self._lock:
+            if max_queued is not None:
+                queued = sum(1 for job in self._jobs.values() if job["status"] == "queued")
+                if queued >= max_queued:
+                    return False
+            self._jobs[job_id] = {
+                "status": "queued",
+                "params": params,
+                "message": "Job queued",
+            }
+            self._log_locks[job_id] = threading.Lock()
+            self._log_counts[job_id] = 0
+            self._conds[job_id] = threading.Condition()
+            self._async_waiters[job_id] = set()
+            self._logs[job_id] = deque(maxlen=self.max_logs)
+        return True
+
+    def update_job(self, job_id: str, status: str, message: Optional[str] = None) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["status"] = status
+            if message is not None:
+                job["message"] = message
+        self._notify(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def count_jobs(self, status: str) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == status)
+
+    def append_log(self, job_id: str, entry: bytes) -> None:
+        logs = self._logs.get(job_id)
+        if logs is None:
+            return
+        with self._log_locks[job_id]:
+            seq = self._log_counts[job_id]
+            logs.append((seq, entry))
+            self._log_counts[job_id] = seq + 1
+        self._notify(job_id)
+
+    def get_logs_since(self, job_id: str, offset: int) -> Tuple[List[bytes], int]:
+        logs = self._logs.get(job_id)
+        if not logs:
+            return [], offset
+        snapshot = logs.copy()
+        first = snapshot[0][0]  # Sequence number of the oldest line still kept
+        messages = [entry for _, entry in itertools.islice(snapshot, max(0, offset - first), None)]
+        return messages, snapshot[-1][0] + 1
+
+    def _has_update(self, job_id: str, offset: int) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINAL_STATUSES:
+                return True
+        return self._log_counts.get(job_id, 0) > offset
+
+    def wait_for_update(self, job_id: str, offset: int, timeout: float) -> bool:
+        cond = self._conds.get(job_id)
+        if cond is None:
+            return True
+        # Check and wait under the condition so a notify between the two
+        # cannot be missed
+        with cond:
+            if self._has_update(job_id, offset):
+                return True
+            return cond.wait(timeout=timeout)
+
+    async def wait_for_update_async(self, job_id: str, offset: int, timeout: float) -> bool:
+        if job_id not in self._conds:
+            return True
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        # Register before checking so a notify between the two cannot be missed
+        self._async_waiters[job_id].add(waiter)
+        try:
+            if self._has_update(job_id, offset):
+                return True
+            try:
+                await asyncio.wait_for(waiter[1].wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+            return True
+        finally:
+            self._async_waiters[job_id].discard(waiter)
+
+
+# KEYS: job hash, log counter, queued status set
+# ARGV: job id, JSON params, queue limit (-1 for none)
+_CREATE_JOB_SCRIPT = """
+local limit = tonumber(ARGV[3])
+if limit >= 0 and redis.call("SCARD", KEYS[3]) >= limit then
+    return 0
+end
+redis.call("HSET", KEYS[1], "status", "queued", "message", "Job queued", "params", ARGV[2])
+redis.call("SET", KEYS[2], 0)
+redis.call("SADD", KEYS[3], ARGV[1])
+return 1
+"""
+
+
+class RedisJobStore(JobStore):
+    """
+    Multi-process job store backed by Redis.
+
+    Each job is a hash (status, message, params) plus a list of its most
+    recent log lines and a counter of all lines ever appended. Writers
+    publish on a per-job channel so waiting readers wake up immediately.
+    """
+
+    def __init__(self, url: str, max_logs: int = API_MAX_JOB_LOGS, prefix: str = "audiogiphy:job"):
+        if redis is None:
+            raise RuntimeError(
+                "redis is not installed. Please install it with: pip install redis"
+            )
+        self.url = url
+        self.max_logs = max_logs
+        self.prefix = prefix
+        # Responses stay raw bytes so log entries come back exactly as stored
+        self._redis = redis.Redis.from_url(url)
+        self._async_redis = None  # Created on first use, inside the event loop
+        self._create_job_script = self._redis.register_script(_CREATE_JOB_SCRIPT)
+
+    def _key(self, job_id: str, suffix: str = "") -> str:
+        return f"{self.prefix}:{job_id}{suffix}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self.prefix}:status:{status}"
+
+    def _publish(self, job_id: str) -> None:
+        self._redis.publish(self._key(job_id, ":events"), "update")
+
+    def create_job(self, job_id: str, params: Dict[str, Any], max_queued: Optional[int] = None) -> bool:
+        # A script runs atomically on the server, so workers of other processes
+        # cannot queue a job between the limit check and the insert
+        created = self._create_job_script(
+            keys=[self._key(job_id), self._key(job_id, ":log_count"), self._status_key("queued")],
+            args=[job_id, json.dumps(params), -1 if max_queued is None else max_queued],
+        )
+        return bool(created)
+
+    def update_job(self, job_id: str, status: str, message: Optional[str] = None) -> None:
+        key = self._key(job_id)
+        old_status = self._redis.hget(key, "status")
+        if old_status is None:
+            return
+        old_status = old_status.decode("utf-8")
+        mapping = {"status": status}
+        if message is not None:
+            mapping["message"] = message
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        pipe.srem(self._status_key(old_status), job_id)
+        pipe.sadd(self._status_key(status), job_id)
+        pipe.execute()
+        self._publish(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self._redis.hgetall(self._key(job_id))
+        if not data:
+            return None
+        return {
+            "status": data.get(b"status", b"").decode("utf-8"),
+            "message": data.get(b"message", b"").decode("utf-8"),
+            "params": json.loads(data.get(b"params", b"{}")),
+        }
+
+    def count_jobs(self, status: str) -> int:
+        return int(self._redis.scard(self._status_key(status)))
+
+    def append_log(self, job_id: str, entry: bytes) -> None:
+        logs_key = self._key(job_id, ":logs")
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.rpush(logs_key, entry)
+        pipe.ltrim(logs_key, -self.max_logs, -1)
+        pipe.incr(self._key(job_id, ":log_count"))
+        pipe.execute()
+        self._publish(job_id)
+
+    def get_logs_since(self, job_id: str, offset: int) -> Tuple[List[bytes], int]:
+        logs_key = self._key(job_id, ":logs")
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.get(self._key(job_id, ":log_count"))
+        pipe.lrange(logs_key, 0, -1)
+        total, logs = pipe.execute()
+        total = int(total or 0)
+        first = total - len(logs)  # Offset of the oldest line still kept
+        return logs[max(0, offset - first):], total
+
+    def _has_update(self, job_id: str, offset: int) -> bool:
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hget(self._key(job_id), "status")
+        pipe.get(self._key(job_id, ":log_count"))
+        status, total = pipe.execute()
+        return self._is_update(status, total, offset)
+
+    @staticmethod
+    def _is_update(status: Optional[bytes], total: Optional[bytes], offset: int) -> bool:
+        return (
+            status is None
+            or status.decode("utf-8") in FINAL_STATUSES
+            or int(total or 0) > offset
+        )
+
+    def wait_for_update(self, job_id: str, offset: int, timeout: float) -> bool:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._key(job_id, ":events"))
+        try:
+            # Subscribe before checking so an update in between is not missed
+            if self._has_update(job_id, offset):
+                return True
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if pubsub.get_message(timeout=remaining) is not None:
+                    return True
+        finally:
+            pubsub.close()
+
+    async def wait_for_update_async(self, job_id: str, offset: int, timeout: float) -> bool:
+        if self._async_redis is None:
+            self._async_redis = redis.asyncio.Redis.from_url(self.url)
+        pubsub = self._async_redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._key(job_id, ":events"))
+        try:
+            # Subscribe before checking so an update in between is not missed
+            pipe = self._async_redis.pipeline(transaction=True)
+            pipe.hget(self._key(job_id), "status")
+            pipe.get(self._key(job_id, ":log_count"))
+            status, total = await pipe.execute()
+            if self._is_update(status, total, offset):
+                return True
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if await pubsub.get_message(timeout=remaining) is not None:
+                    return True
+        finally:
+            await pubsub.aclose()
+
+
+def create_job_store() -> JobStore:
+    """
+    Create the job store selected by the AUDIOGIPHY_JOB_STORE environment variable.
+
+    "memory" (default) keeps jobs in this process. "redis" connects to
+    AUDIOGIPHY_REDIS_URL (default: redis://localhost:6379/0).
+    """
+    backend = os.getenv("AUDIOGIPHY_JOB_STORE", "memory").lower()
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "redis":
+        return RedisJobStore(os.getenv("AUDIOGIPHY_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown AUDIOGIPHY_JOB_STORE backend: {backend}. Must be 'memory' or 'redis'")
@@ -5,37 +5,80 @@ This module handles speech-to-text transcription of audio files using Whisper,
 providing word-level timestamps for lyric detection and synchronization.
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import functools
+import hashlib
 import logging
+import os
+import threading
 from pathlib import Path
 
+import numpy as np
+
 try:
     import whisper
-    WHISPER_AVAILABLE = True
+    OPENAI_WHISPER_AVAILABLE = True
 except ImportError:
-    WHISPER_AVAILABLE = False
+    OPENAI_WHISPER_AVAILABLE = False
     whisper = None
 
+try:
+    import ctranslate2
+    from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    ctranslate2 = None
+    BatchedInferencePipeline = None
+    WhisperModel = None
+    decode_audio = None
+    VadOptions = None
+    get_speech_timestamps = None
+
+WHISPER_AVAILABLE = OPENAI_WHISPER_AVAILABLE or FASTER_WHISPER_AVAILABLE
+
+from audiogiphy.disk_cache import get_memory
 from audiogiphy.config import (
+    WHISPER_BACKEND,
+    WHISPER_BATCH_SIZE,
     WHISPER_MODEL_SIZE,
     WHISPER_DEFAULT_LANGUAGE,
     WHISPER_TEMPERATURE,
+    WHISPER_TORCH_COMPILE,
     WHISPER_COMPRESSION_RATIO_THRESHOLD,
     WHISPER_LOGPROB_THRESHOLD,
     WHISPER_NO_SPEECH_THRESHOLD,
+    WHISPER_VAD_FILTER,
+    WHISPER_VAD_MIN_SILENCE_MS,
 )
 
 __all__ = [
     "LyricWord",
     "LyricsResult",
     "detect_lyrics",
+    "detect_lyrics_batch",
+    "clear_model_cache",
 ]
 
 logger = logging.getLogger("audiogiphy.lyrics_analysis")
 
+# Loaded Whisper models keyed by (backend, model size), shared by every
+# detect_lyrics call in the process so weights are only loaded once
+_MODEL_CACHE: Dict[Tuple[str, str], Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
 
-@dataclass
+# Bump when transcription changes in a way that invalidates on-disk results
+_CACHE_VERSION = 1
+
+_VALID_MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+_WHISPER_SAMPLE_RATE = 16000
+_WHISPER_CHUNK_SECONDS = 30
+
+
+@dataclass(frozen=True, slots=True)
 class LyricWord:
     """
     A single word with timing information.
@@ -65,65 +108,163 @@ class LyricsResult:
     words: List[LyricWord]
     language: str
     duration: float
+    
+    # Column (SoA) views of ``words`` so consumers can mask, sort and bucket
+    # with numpy instead of walking LyricWord objects. Built on first access;
+    # ``words`` is treated as read-only once a result has been returned.
+    @functools.cached_property
+    def starts(self) -> np.ndarray:
+        """Word start times in seconds, parallel to ``words``."""
+        return np.fromiter((w.start for w in self.words), dtype=np.float64, count=len(self.words))
+    
+    @functools.cached_property
+    def ends(self) -> np.ndarray:
+        """Word end times in seconds, parallel to ``words``."""
+        return np.fromiter((w.end for w in self.words), dtype=np.float64, count=len(self.words))
+    
+    @functools.cached_property
+    def texts(self) -> np.ndarray:
+        """Word texts as an object array, parallel to ``words``."""
+        texts = np.empty(len(self.words), dtype=object)
+        texts[:] = [w.word for w in self.words]
+        return texts
 
 
-def detect_lyrics(
-    audio_path: str,
-    language: Optional[str] = None,
-    model_size: Optional[str] = None,
-    initial_prompt: Optional[str] = None,
-) -> LyricsResult:
+def _select_backend() -> str:
     """
-    Detect lyrics from an audio file using Whisper speech-to-text.
+    Pick the Whisper backend to use for transcription.
     
-    This function transcribes the audio and provides word-level timestamps
-    for synchronization with visuals.
+    Returns:
+        "faster" when WHISPER_BACKEND asks for it and faster-whisper is
+        installed, otherwise "openai" if openai-whisper is installed, otherwise
+        whichever backend is available
+    """
+    if WHISPER_BACKEND == "faster" and FASTER_WHISPER_AVAILABLE:
+        return "faster"
+    if OPENAI_WHISPER_AVAILABLE:
+        return "openai"
+    return "faster"
+
+
+@functools.lru_cache(maxsize=None)
+def _device_and_compute_type(backend: str) -> Tuple[str, str]:
+    """Return the (device, compute type) Whisper models run with for a backend."""
+    if backend == "faster":
+        # int8 weights on CPU; int8 weights with fp16 activations on GPU
+        if ctranslate2.get_cuda_device_count() > 0:
+            return "cuda", "int8_float16"
+        return "cpu", "int8"
+    
+    import torch  # openai-whisper depends on torch
+    
+    if torch.cuda.is_available():
+        return "cuda", "fp16"
+    return "cpu", "fp32"
+
+
+def _load_model(backend: str, model_size: str):
+    """Load a Whisper model for the given backend."""
+    device, compute_type = _device_and_compute_type(backend)
+    logger.info(f"Whisper device: {device} ({compute_type})")
+    if backend == "faster":
+        return WhisperModel(model_size, device=device, compute_type=compute_type)
+    
+    import torch  # openai-whisper depends on torch
+    
+    model = whisper.load_model(model_size, device=device)
+    if WHISPER_TORCH_COMPILE:
+        if device == "cuda":
+            # Persist compiled kernels so later processes skip most of the
+            # compile warmup
+            os.environ.setdefault(
+                "TORCHINDUCTOR_CACHE_DIR",
+                str(Path.home() / ".cache" / "audiogiphy" / "inductor"),
+            )
+            logger.info("Compiling Whisper text decoder with torch.compile")
+            model.decoder = torch.compile(model.decoder, mode="reduce-overhead", fullgraph=False)
+    return model
+
+
+def _get_model(backend: str, model_size: str):
+    """
+    Return the Whisper model for (backend, model_size), loading it on first use.
     
     Args:
-        audio_path: Path to input audio file
-        language: Language code (e.g., 'en', 'es', 'fr'). None for auto-detect
-        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
-                    None to use default from config
-        initial_prompt: Optional prompt to guide transcription (e.g., song title, artist)
+        backend: "faster" or "openai"
+        model_size: Whisper model size ('tiny', 'base', ...)
         
     Returns:
-        LyricsResult containing transcript, word timestamps, language, and duration
+        Loaded Whisper model
         
     Raises:
-        FileNotFoundError: If audio file doesn't exist
-        RuntimeError: If Whisper is not installed or transcription fails
-        ValueError: If model_size is invalid
+        RuntimeError: If the model fails to load
     """
-    if not WHISPER_AVAILABLE:
-        raise RuntimeError(
-            "Whisper is not installed. Please install it with: pip install openai-whisper"
-        )
-    
-    path = Path(audio_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Audio file not found: {audio_path}")
-    
-    if model_size is None:
-        model_size = WHISPER_MODEL_SIZE
+    key = (backend, model_size)
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        return model
     
-    valid_models = ["tiny", "base", "small", "medium", "large"]
-    if model_size not in valid_models:
-        raise ValueError(f"Invalid model_size: {model_size}. Must be one of {valid_models}")
+    # Hold the lock while loading so concurrent callers don't load the same
+    # weights twice
+    with _MODEL_CACHE_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            logger.info(f"Loading Whisper model: {model_size} ({backend}-whisper)")
+            try:
+                model = _load_model(backend, model_size)
+            except Exception as e:
+                raise RuntimeError(f"Failed to load Whisper model: {e}") from e
+            _MODEL_CACHE[key] = model
+        return model
+
+
+def clear_model_cache() -> None:
+    """Drop all cached Whisper models so their memory can be released."""
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+
+
+def _speech_clips(audio: np.ndarray) -> List[Tuple[float, float]]:
+    """
+    Find speech in 16 kHz audio with Silero VAD.
     
-    if language is None:
-        language = WHISPER_DEFAULT_LANGUAGE
+    Neighbouring speech regions are merged into contiguous clips of at most
+    30 seconds (one Whisper window each).
     
-    logger.info(f"Loading Whisper model: {model_size}")
-    try:
-        model = whisper.load_model(model_size)
-    except Exception as e:
-        raise RuntimeError(f"Failed to load Whisper model: {e}") from e
+    Args:
+        audio: Mono float32 audio at 16 kHz
+        
+    Returns:
+        List of (start, end) clips in seconds, empty if no speech was found
+    """
+    regions = get_speech_timestamps(
+        audio,
+        VadOptions(
+            min_silence_duration_ms=WHISPER_VAD_MIN_SILENCE_MS,
+            max_speech_duration_s=_WHISPER_CHUNK_SECONDS,
+        ),
+    )
     
-    logger.info(f"Transcribing audio: {audio_path}")
-    logger.info(f"Language: {language if language != 'auto' else 'auto-detect'}")
-    if initial_prompt:
-        logger.info(f"Initial prompt: {initial_prompt}")
+    clips: List[Tuple[float, float]] = []
+    for region in regions:
+        start = region["start"] / _WHISPER_SAMPLE_RATE
+        end = region["end"] / _WHISPER_SAMPLE_RATE
+        if clips and end - clips[-1][0] <= _WHISPER_CHUNK_SECONDS:
+            clips[-1] = (clips[-1][0], end)
+        else:
+            clips.append((start, end))
+    return clips
+
+
+def _transcribe_openai(
+    model, path: Path, language: str, initial_prompt: Optional[str]
+) -> Tuple[str, List[LyricWord], str, float]:
+    """
+    Transcribe with openai-whisper.
     
+    Returns:
+        Tuple of (transcript, words, detected language, duration)
+    """
     # Build transcription options optimized for music
     transcribe_options = {
         "word_timestamps": True,
@@ -132,6 +273,8 @@ def detect_lyrics(
         "compression_ratio_threshold": WHISPER_COMPRESSION_RATIO_THRESHOLD,
         "logprob_threshold": WHISPER_LOGPROB_THRESHOLD,
         "no_speech_threshold": WHISPER_NO_SPEECH_THRESHOLD,
+        # Half precision on GPU; on CPU whisper would warn and fall back anyway
+        "fp16": model.device.type == "cuda",
     }
     
     # Add language if specified
@@ -142,9 +285,24 @@ def detect_lyrics(
     if initial_prompt:
         transcribe_options["initial_prompt"] = initial_prompt
     
+    audio = str(path)
+    # Silero VAD ships with faster-whisper; without it, transcribe everything
+    if WHISPER_VAD_FILTER and FASTER_WHISPER_AVAILABLE:
+        try:
+            audio = whisper.load_audio(str(path))
+        except Exception as e:
+            raise RuntimeError(f"Whisper transcription failed: {e}") from e
+        clips = _speech_clips(audio)
+        if not clips:
+            logger.info("No speech detected, skipping transcription")
+            return "", [], language, audio.shape[0] / _WHISPER_SAMPLE_RATE
+        
+        # Whisper only decodes inside these spans; timestamps stay absolute
+        transcribe_options["clip_timestamps"] = [t for clip in clips for t in clip]
+    
     try:
         # Transcribe with word-level timestamps and optimized parameters
-        result = model.transcribe(str(path), **transcribe_options)
+        result = model.transcribe(audio, **transcribe_options)
     except Exception as e:
         raise RuntimeError(f"Whisper transcription failed: {e}") from e
     
@@ -181,6 +339,172 @@ def detect_lyrics(
         last_segment = segments[-1]
         duration = float(last_segment.get("end", 0.0))
     
+    return transcript, words, detected_language, duration
+
+
+def _transcribe_faster(
+    model, path: Path, language: str, initial_prompt: Optional[str]
+) -> Tuple[str, List[LyricWord], str, float]:
+    """
+    Transcribe with faster-whisper (CTranslate2).
+    
+    Returns:
+        Tuple of (transcript, words, detected language, duration)
+    """
+    try:
+        # segments is a lazy generator; decoding happens while it is consumed
+        segments, info = model.transcribe(
+            str(path),
+            language=None if language == "auto" else language,
+            initial_prompt=initial_prompt or None,
+            word_timestamps=True,
+            temperature=WHISPER_TEMPERATURE,
+            compression_ratio_threshold=WHISPER_COMPRESSION_RATIO_THRESHOLD,
+            log_prob_threshold=WHISPER_LOGPROB_THRESHOLD,
+            no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
+            vad_filter=WHISPER_VAD_FILTER,
+            vad_parameters={"min_silence_duration_ms": WHISPER_VAD_MIN_SILENCE_MS},
+        )
+        
+        texts: List[str] = []
+        words: List[LyricWord] = []
+        for segment in segments:
+            texts.append(segment.text)
+            for word_data in segment.words or ():
+                word_text = word_data.word.strip()
+                
+                # Skip empty words
+                if not word_text:
+                    continue
+                
+                words.append(LyricWord(
+                    word=word_text,
+                    start=float(word_data.start),
+                    end=float(word_data.end),
+                ))
+    except Exception as e:
+        raise RuntimeError(f"Whisper transcription failed: {e}") from e
+    
+    return "".join(texts).strip(), words, info.language, float(info.duration)
+
+
+def detect_lyrics(
+    audio_path: str,
+    language: Optional[str] = None,
+    model_size: Optional[str] = None,
+    initial_prompt: Optional[str] = None,
+) -> LyricsResult:
+    """
+    Detect lyrics from an audio file using Whisper speech-to-text.
+    
+    This function transcribes the audio and provides word-level timestamps
+    for synchronization with visuals.
+    
+    Args:
+        audio_path: Path to input audio file
+        language: Language code (e.g., 'en', 'es', 'fr'). None for auto-detect
+        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+                    None to use default from config
+        initial_prompt: Optional prompt to guide transcription (e.g., song title, artist)
+        
+    Returns:
+        LyricsResult containing transcript, word timestamps, language, and duration
+        
+    Raises:
+        FileNotFoundError: If audio file doesn't exist
+        RuntimeError: If Whisper is not installed or transcription fails
+        ValueError: If model_size is invalid
+    """
+    if not WHISPER_AVAILABLE:
+        raise RuntimeError(
+            "Whisper is not installed. Please install it with: "
+            "pip install faster-whisper (or openai-whisper)"
+        )
+    
+    path = Path(audio_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    
+    if model_size is None:
+        model_size = WHISPER_MODEL_SIZE
+    
+    if model_size not in _VALID_MODEL_SIZES:
+        raise ValueError(f"Invalid model_size: {model_size}. Must be one of {_VALID_MODEL_SIZES}")
+    
+    if language is None:
+        language = WHISPER_DEFAULT_LANGUAGE
+    
+    # Transcripts are memoized on disk by audio content, so re-running on the
+    # same track (even renamed or copied) skips Whisper entirely
+    backend = _select_backend()
+    transcribe = get_memory().cache(_transcribe_file, ignore=["audio_path"])
+    return transcribe(
+        str(path),
+        _file_digest(path),
+        backend,
+        model_size,
+        language,
+        initial_prompt,
+        WHISPER_VAD_FILTER,
+        decode_options=(
+            WHISPER_TEMPERATURE,
+            WHISPER_COMPRESSION_RATIO_THRESHOLD,
+            WHISPER_LOGPROB_THRESHOLD,
+            WHISPER_NO_SPEECH_THRESHOLD,
+            WHISPER_VAD_MIN_SILENCE_MS,
+            _device_and_compute_type(backend)[1],
+        ),
+        cache_version=_CACHE_VERSION,
+    )
+
+
+
+def _file_digest(path: Path) -> str:
+    """BLAKE2b hex digest of a file's contents, read in 1 MB chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _transcribe_file(
+    audio_path: str,
+    content_digest: str,
+    backend: str,
+    model_size: str,
+    language: str,
+    initial_prompt: Optional[str],
+    vad_filter: bool,
+    decode_options: Tuple[Any, ...] = (),
+    cache_version: int = _CACHE_VERSION,
+) -> LyricsResult:
+    """
+    Run Whisper on one file for detect_lyrics.
+    
+    audio_path is excluded from the cache key; content_digest, vad_filter,
+    decode_options and cache_version are not used in the computation, they
+    are arguments so that the cache is keyed by the audio content, the VAD
+    and decoding settings (temperature, thresholds, VAD silence, model
+    compute type) and the transcription code version.
+    """
+    model = _get_model(backend, model_size)
+    path = Path(audio_path)
+    
+    logger.info(f"Transcribing audio: {audio_path}")
+    logger.info(f"Language: {language if language != 'auto' else 'auto-detect'}")
+    if initial_prompt:
+        logger.info(f"Initial prompt: {initial_prompt}")
+    
+    if backend == "faster":
+        transcript, words, detected_language, duration = _transcribe_faster(
+            model, path, language, initial_prompt
+        )
+    else:
+        transcript, words, detected_language, duration = _transcribe_openai(
+            model, path, language, initial_prompt
+        )
+    
     logger.info(f"Transcription complete: {len(words)} words detected")
     logger.info(f"Detected language: {detected_language}")
     
@@ -191,3 +515,149 @@ def detect_lyrics(
         duration=duration,
     )
 
+
+def detect_lyrics_batch(
+    audio_paths: Sequence[str],
+    language: Optional[str] = None,
+    model_size: Optional[str] = None,
+    initial_prompt: Optional[str] = None,
+    batch_size: int = WHISPER_BATCH_SIZE,
+) -> List[LyricsResult]:
+    """
+    Detect lyrics from several audio files with batched Whisper inference.
+    
+    With the faster-whisper backend, all files are cut into 30-second clips
+    and transcribed together, batch_size clips per encoder/decoder pass, so
+    many short files cost roughly as much as one long one. With openai-whisper,
+    or a single file, this is the same as calling detect_lyrics per file.
+    
+    Batched transcripts do not go through the on-disk transcription cache
+    that detect_lyrics uses: they depend on the whole batch (clips are
+    batched across files, and 'auto' detects one language for all of them),
+    so they are neither read from nor written to it.
+    
+    Args:
+        audio_paths: Paths to input audio files
+        language: Language code shared by all files, or 'auto' to detect one
+                  language for the whole batch. None to use default from config
+        model_size: Whisper model size. None to use default from config
+        initial_prompt: Optional prompt applied to every file
+        batch_size: Number of 30-second clips per inference batch
+        
+    Returns:
+        One LyricsResult per input path, in input order
+        
+    Raises:
+        FileNotFoundError: If any audio file doesn't exist
+        RuntimeError: If Whisper is not installed or transcription fails
+        ValueError: If model_size is invalid
+    """
+    if not WHISPER_AVAILABLE:
+        raise RuntimeError(
+            "Whisper is not installed. Please install it with: "
+            "pip install faster-whisper (or openai-whisper)"
+        )
+    
+    if len(audio_paths) <= 1 or _select_backend() != "faster":
+        return [
+            detect_lyrics(audio_path, language, model_size, initial_prompt)
+            for audio_path in audio_paths
+        ]
+    
+    paths = [Path(audio_path) for audio_path in audio_paths]
+    for path in paths:
+        if not path.exists():
+            raise FileNotFoundError(f"Audio file not found: {path}")
+    
+    if model_size is None:
+        model_size = WHISPER_MODEL_SIZE
+    if model_size not in _VALID_MODEL_SIZES:
+        raise ValueError(f"Invalid model_size: {model_size}. Must be one of {_VALID_MODEL_SIZES}")
+    
+    if language is None:
+        language = WHISPER_DEFAULT_LANGUAGE
+    
+    model = _get_model("faster", model_size)
+    
+    # Lay the files end to end in one 16 kHz buffer and describe each file's
+    # span (or just its speech, with VAD) as <=30s clips; the pipeline batches
+    # clips across file boundaries
+    audios = [decode_audio(str(path), sampling_rate=_WHISPER_SAMPLE_RATE) for path in paths]
+    offsets: List[float] = []
+    durations: List[float] = []
+    clips: List[Dict[str, float]] = []
+    position = 0
+    for audio in audios:
+        offset = position / _WHISPER_SAMPLE_RATE
+        duration = audio.shape[0] / _WHISPER_SAMPLE_RATE
+        offsets.append(offset)
+        durations.append(duration)
+        if WHISPER_VAD_FILTER:
+            file_clips = _speech_clips(audio)
+        else:
+            file_clips = [
+                (start, min(start + _WHISPER_CHUNK_SECONDS, duration))
+                for start in range(0, int(np.ceil(duration)), _WHISPER_CHUNK_SECONDS)
+            ]
+        clips.extend({"start": offset + start, "end": offset + end} for start, end in file_clips)
+        position += audio.shape[0]
+    
+    if not clips:
+        logger.info("No speech detected, skipping transcription")
+        return [
+            LyricsResult(transcript="", words=[], language=language, duration=duration)
+            for duration in durations
+        ]
+    
+    logger.info(f"Transcribing {len(paths)} files as {len(clips)} clips (batch size {batch_size})")
+    
+    texts: List[List[str]] = [[] for _ in paths]
+    words: List[List[LyricWord]] = [[] for _ in paths]
+    try:
+        pipeline = BatchedInferencePipeline(model=model)
+        segments, info = pipeline.transcribe(
+            np.concatenate(audios),
+            language=None if language == "auto" else language,
+            initial_prompt=initial_prompt or None,
+            word_timestamps=True,
+            temperature=WHISPER_TEMPERATURE,
+            compression_ratio_threshold=WHISPER_COMPRESSION_RATIO_THRESHOLD,
+            log_prob_threshold=WHISPER_LOGPROB_THRESHOLD,
+            no_speech_threshold=WHISPER_NO_SPEECH_THRESHOLD,
+            vad_filter=False,
+            clip_timestamps=clips,
+            batch_size=batch_size,
+        )
+        
+        for segment in segments:
+            # Clips never cross files, so a segment belongs to the file whose
+            # span contains its start
+            index = bisect_right(offsets, segment.start) - 1
+            offset = offsets[index]
+            texts[index].append(segment.text)
+            for word_data in segment.words or ():
+                word_text = word_data.word.strip()
+                
+                # Skip empty words
+                if not word_text:
+                    continue
+                
+                words[index].append(LyricWord(
+                    word=word_text,
+                    start=float(word_data.start) - offset,
+                    end=float(word_data.end) - offset,
+                ))
+    except Exception as e:
+        raise RuntimeError(f"Whisper transcription failed: {e}") from e
+    
+    logger.info(f"Batch transcription complete: {sum(map(len, words))} words detected")
+    
+    return [
+        LyricsResult(
+            transcript="".join(texts[i]).strip(),
+            words=words[i],
+            language=info.language,
+            duration=durations[i],
+        )
+        for i in range(len(paths))
+    ]
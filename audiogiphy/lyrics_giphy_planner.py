@@ -8,7 +8,17 @@ with gif_query keywords from LLM output.
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from audiogiphy.giphy_client import GiphyClient
 
@@ -17,6 +27,67 @@ __all__ = ["plan_giphy_segments"]
 logger = logging.getLogger("audiogiphy.lyrics_giphy_planner")
 
 
+def _iter_segments(path: Path) -> Iterator[Any]:
+    """
+    Yield the entries of a segments JSON file's "segments" list.
+    
+    With ijson installed the file is parsed incrementally, so only one
+    segment is held in memory at a time; otherwise it is loaded in full with
+    orjson (or json).
+    
+    Args:
+        path: Path to the segments JSON file
+        
+    Yields:
+        Each entry of the "segments" list, as parsed from JSON
+        
+    Raises:
+        ValueError: If the JSON is invalid or has no "segments" list
+    """
+    if ijson is None:
+        try:
+            if orjson is not None:
+                data = orjson.loads(path.read_bytes())
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+        except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            raise ValueError(f"Invalid JSON in segments file: {e}") from e
+        
+        if not isinstance(data, dict) or "segments" not in data:
+            raise ValueError("Segments JSON must have a 'segments' key")
+        if not isinstance(data["segments"], list):
+            raise ValueError("Segments must be a list")
+        yield from data["segments"]
+        return
+    
+    top_event = None  # First parser event of the document
+    segments_event = None  # First parser event of the top-level "segments" value
+    
+    with open(path, 'rb') as f:
+        def events():
+            nonlocal top_event, segments_event
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if top_event is None:
+                    top_event = event
+                if prefix == "segments" and segments_event is None:
+                    segments_event = event
+                yield prefix, event, value
+        
+        try:
+            yield from ijson.items(events(), "segments.item")
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON in segments file: {e}") from e
+    
+    # Structure problems only show up once the whole document has been seen;
+    # nothing has been yielded in these cases
+    if top_event != "start_map" or segments_event is None:
+        raise ValueError("Segments JSON must have a 'segments' key")
+    if segments_event != "start_array":
+        raise ValueError("Segments must be a list")
+
+
 def plan_giphy_segments(
     segments_json_path: str,
     giphy_client: GiphyClient,
@@ -60,28 +131,14 @@ def plan_giphy_segments(
     if not path.exists():
         raise FileNotFoundError(f"Segments JSON file not found: {segments_json_path}")
     
-    # Load JSON
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in segments file: {e}") from e
-    
-    # Validate structure
-    if not isinstance(data, dict) or "segments" not in data:
-        raise ValueError("Segments JSON must have a 'segments' key")
-    
-    segments = data["segments"]
-    if not isinstance(segments, list):
-        raise ValueError("Segments must be a list")
-    
-    logger.info(f"Loaded {len(segments)} segments from {segments_json_path}")
-    
-    # Extract all gif_query strings and deduplicate
+    # Extract all gif_query strings and deduplicate, keeping what the final
+    # mapping needs from each segment so the file is only read once
     unique_queries: set[str] = set()
-    segment_queries: Dict[int, str] = {}  # segment_id -> gif_query
+    pending: List[Tuple[Any, str, Any, Any]] = []  # (segment_id, gif_query, start, end)
+    segment_count = 0
     
-    for segment in segments:
+    for segment in _iter_segments(path):
+        segment_count += 1
         if not isinstance(segment, dict):
             logger.warning(f"Skipping invalid segment (not a dict): {segment}")
             continue
@@ -94,38 +151,33 @@ def plan_giphy_segments(
             continue
         
         if not gif_query:
-            logger.debug(f"Segment {segment_id} has no gif_query, skipping GIPHY lookup")
+            logger.debug("Segment %s has no gif_query, skipping GIPHY lookup", segment_id)
             continue
         
         unique_queries.add(gif_query)
-        segment_queries[segment_id] = gif_query
+        pending.append((segment_id, gif_query, segment.get("start", 0.0), segment.get("end", 0.0)))
     
-    logger.info(f"Found {len(unique_queries)} unique gif_query strings: {list(unique_queries)}")
+    sorted_queries = sorted(unique_queries)
+    logger.info(f"Loaded {segment_count} segments from {segments_json_path}")
+    logger.info(f"Found {len(sorted_queries)} unique gif_query strings: {sorted_queries}")
     
-    # Call GIPHY API for each unique query (caching handled by client)
-    query_to_urls: Dict[str, List[str]] = {}
-    for query in unique_queries:
-        logger.info(f"Fetching GIPHY results for query: '{query}'")
-        urls = giphy_client.search_gifs(query, limit=25)
-        query_to_urls[query] = urls
+    # Call GIPHY API for all unique queries concurrently (caching handled by client)
+    logger.info(f"Fetching GIPHY results for {len(sorted_queries)} queries")
+    query_to_urls: Dict[str, List[str]] = giphy_client.search_gifs_batch(sorted_queries, limit=25)
+    for query, urls in query_to_urls.items():
         logger.info(f"Got {len(urls)} GIF URLs for query '{query}'")
     
     # Build final mapping: segment_id -> {gif_query, gif_urls, start, end}
     result: Dict[int, Dict[str, any]] = {}
-    for segment in segments:
-        segment_id = segment.get("id")
-        if segment_id is None or segment_id not in segment_queries:
-            continue
-        
-        gif_query = segment_queries[segment_id]
+    for segment_id, gif_query, start, end in pending:
         gif_urls = query_to_urls.get(gif_query, [])
         result[segment_id] = {
             "gif_query": gif_query,
             "gif_urls": gif_urls,
-            "start": segment.get("start", 0.0),
-            "end": segment.get("end", 0.0),
+            "start": start,
+            "end": end,
         }
-        logger.debug(f"Segment {segment_id}: query='{gif_query}', {len(gif_urls)} URLs, time={result[segment_id]['start']:.1f}-{result[segment_id]['end']:.1f}s")
+        logger.debug("Segment %s: query='%s', %d URLs, time=%.1f-%.1fs", segment_id, gif_query, len(gif_urls), start, end)
     
     logger.info(f"Built GIPHY plan for {len(result)} segments")
     return result
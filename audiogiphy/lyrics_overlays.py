@@ -8,7 +8,17 @@ phrase-ending words for overlay on video clips.
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from audiogiphy.lyrics_analysis import LyricsResult
 
 __all__ = [
     "extract_lyric_anchors",
@@ -32,6 +42,17 @@ STOPWORDS = {
     "only", "own", "same", "so", "than", "too", "very", "just", "now",
 }
 
+# Punctuation that ends a phrase; stripped from the end of words before
+# stopword checks and anchor output
+_PUNCT_CHARS = ".,!?;:"
+_PUNCT_SET = frozenset(_PUNCT_CHARS)
+
+# Words that often end phrases in lyrics (even without punctuation)
+_PHRASE_ENDING_WORDS = frozenset({"home", "say", "yeah", "ready", "go", "know", "see", "do", "be"})
+
+# Words that commonly start a new sentence after a phrase-ending word
+_SENTENCE_STARTERS = frozenset({"if", "and", "but", "then", "you", "i"})
+
 
 def is_stopword(word: str) -> bool:
     """
@@ -43,10 +64,62 @@ def is_stopword(word: str) -> bool:
     Returns:
         True if word is a stopword
     """
-    cleaned = word.lower().strip().rstrip(".,!?;:")
+    cleaned = word.lower().strip().rstrip(_PUNCT_CHARS)
     return cleaned in STOPWORDS or len(cleaned) <= 1
 
 
+def _prepare_words(words: List[dict]) -> None:
+    """
+    Compute each word's cleaned text and stopword flag once, in place.
+    
+    Adds '_text' (stripped), '_bare' (also without trailing punctuation),
+    '_clean' (bare, lowercased) and '_stop' (is_stopword) to every word dict.
+    Phrase detection and anchor selection use these keys when present instead
+    of re-cleaning the same word at every step.
+    
+    Args:
+        words: List of word dicts with 'word', 'start', 'end' keys
+    """
+    for word_data in words:
+        text = word_data.get("word", "").strip()
+        bare = text.rstrip(_PUNCT_CHARS)
+        cleaned = bare.lower()
+        word_data["_text"] = text
+        word_data["_bare"] = bare
+        word_data["_clean"] = cleaned
+        word_data["_stop"] = cleaned in STOPWORDS or len(cleaned) <= 1
+
+
+def _load_lyrics_json(lyrics_json_path: str) -> dict:
+    """
+    Load a JSON file written by detect-lyrics.
+    
+    Uses orjson when installed (parsing straight from bytes), json otherwise.
+    
+    Args:
+        lyrics_json_path: Path to JSON file from detect-lyrics
+        
+    Returns:
+        Parsed JSON data
+        
+    Raises:
+        FileNotFoundError: If lyrics file doesn't exist
+        ValueError: If the file is not valid JSON
+    """
+    path = Path(lyrics_json_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Lyrics file not found: {lyrics_json_path}")
+    
+    try:
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        raise ValueError(f"Invalid JSON in lyrics file: {e}") from e
+
+
 def find_last_content_word(words: List[dict]) -> Optional[dict]:
     """
     Find the last non-stopword word in a list of words.
@@ -58,8 +131,10 @@ def find_last_content_word(words: List[dict]) -> Optional[dict]:
         Word dict of last content word, or None if all are stopwords
     """
     for word_data in reversed(words):
-        word_text = word_data.get("word", "").strip()
-        if not is_stopword(word_text):
+        stop = word_data.get("_stop")
+        if stop is None:
+            stop = is_stopword(word_data.get("word", ""))
+        if not stop:
             return word_data
     # If all are stopwords, return the last one anyway
     return words[-1] if words else None
@@ -127,34 +202,44 @@ def detect_phrases_by_punctuation(words: List[dict]) -> List[List[dict]]:
     phrases: List[List[dict]] = []
     current_phrase: List[dict] = []
     
-    # Words that often end phrases in lyrics (even without punctuation)
-    phrase_ending_words = {"home", "say", "yeah", "ready", "go", "know", "see", "do", "be"}
+    # Stripped and cleaned text per word, taken from _prepare_words when done
+    if "_clean" in words[0]:
+        texts = [w["_text"] for w in words]
+        cleaned_words = [w["_clean"] for w in words]
+    else:
+        texts = [w.get("word", "").strip() for w in words]
+        cleaned_words = [text.rstrip(_PUNCT_CHARS).lower() for text in texts]
+    
+    # Natural pauses (gaps > 0.3s but < 2.0s) between each word and the next,
+    # computed in one vectorized pass; the last word has no following gap
+    n = len(words)
+    starts = np.fromiter((w.get("start", 0.0) for w in words), dtype=np.float64, count=n)
+    ends = np.fromiter((w.get("end", 0.0) for w in words), dtype=np.float64, count=n)
+    gaps = starts[1:] - ends[:-1]
+    pause_after = ((gaps > 0.3) & (gaps < 2.0)).tolist()
     
     for i, word_data in enumerate(words):
         current_phrase.append(word_data)
-        word_text = word_data.get("word", "").strip().rstrip(".,!?;:")
-        word_lower = word_text.lower()
+        word_lower = cleaned_words[i]
         
         # Check if word ends with punctuation
-        original_word = word_data.get("word", "").strip()
-        if original_word and original_word[-1] in ".,!?;:":
+        original_word = texts[i]
+        if original_word and original_word[-1] in _PUNCT_SET:
             # This word ends a phrase
             phrases.append(current_phrase)
             current_phrase = []
         # Check for natural pauses (gaps > 0.3s but < 2.0s)
-        elif i < len(words) - 1:
-            next_word = words[i + 1]
-            gap = next_word.get("start", 0.0) - word_data.get("end", 0.0)
+        elif i < n - 1:
             # If there's a meaningful gap, treat it as a phrase boundary
-            if 0.3 < gap < 2.0:
+            if pause_after[i]:
                 phrases.append(current_phrase)
                 current_phrase = []
             # Also check if this word is a phrase-ending word and next word starts a new thought
             # (e.g., "home" followed by "you" or capitalized word)
-            elif word_lower in phrase_ending_words:
-                next_word_text = next_word.get("word", "").strip()
+            elif word_lower in _PHRASE_ENDING_WORDS:
+                next_word_text = texts[i + 1]
                 # If next word is capitalized or a common sentence starter, end phrase here
-                if next_word_text and (next_word_text[0].isupper() or next_word_text.lower() in {"if", "and", "but", "then", "you", "i"}):
+                if next_word_text and (next_word_text[0].isupper() or next_word_text.lower() in _SENTENCE_STARTERS):
                     phrases.append(current_phrase)
                     current_phrase = []
     
@@ -183,15 +268,7 @@ def extract_lyric_anchors(lyrics_json_path: str) -> List[dict]:
         FileNotFoundError: If lyrics file doesn't exist
         ValueError: If JSON structure is invalid
     """
-    path = Path(lyrics_json_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Lyrics file not found: {lyrics_json_path}")
-    
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in lyrics file: {e}") from e
+    data = _load_lyrics_json(lyrics_json_path)
     
     words = data.get("words", [])
     if not words:
@@ -200,6 +277,9 @@ def extract_lyric_anchors(lyrics_json_path: str) -> List[dict]:
     
     logger.info(f"Parsing {len(words)} words from lyrics file")
     
+    # Clean each word once; phrase detection and stopword checks below reuse it
+    _prepare_words(words)
+    
     # Primary method: Detect phrases by punctuation
     punctuation_phrases = detect_phrases_by_punctuation(words)
     logger.info(f"Punctuation-based detection: {len(punctuation_phrases)} phrases")
@@ -226,25 +306,18 @@ def extract_lyric_anchors(lyrics_json_path: str) -> List[dict]:
         if not phrase:
             continue
             
+        # The reverse scan already stops at the last content word (even when
+        # punctuation appears mid-phrase), so no second pass over the phrase
         last_word = find_last_content_word(phrase)
         if last_word:
-            word_text = last_word.get("word", "").strip().rstrip(".,!?;:")
+            word_text = last_word["_bare"]
             end_time = last_word.get("end", 0.0)
             
-            # Also check if there are multiple content words - prefer the last one
-            # This handles cases where punctuation appears mid-phrase
-            content_words = [w for w in phrase if not is_stopword(w.get("word", "").strip())]
-            if len(content_words) > 1:
-                # Use the last content word, not necessarily the punctuation-marked one
-                last_content = content_words[-1]
-                word_text = last_content.get("word", "").strip().rstrip(".,!?;:")
-                end_time = last_content.get("end", 0.0)
-            
             anchors.append({
                 "word": word_text,
                 "time_end_sec": float(end_time),
             })
-            logger.debug(f"Phrase {i+1} ({len(phrase)} words): '{word_text}' at {end_time:.2f}s")
+            logger.debug("Phrase %d (%d words): '%s' at %.2fs", i + 1, len(phrase), word_text, end_time)
     
     logger.info(f"Extracted {len(anchors)} lyric anchors from {len(final_phrases)} phrases")
     return anchors
@@ -285,20 +358,23 @@ def map_anchors_to_seconds(
             # If multiple anchors in same second, keep the latest one
             if second_index not in mapping or time_end > time_tracking.get(second_index, 0.0):
                 if second_index in mapping:
-                    logger.debug(f"Replacing anchor at second {second_index}: '{mapping[second_index]}' ({time_tracking[second_index]:.2f}s) -> '{word}' ({time_end:.2f}s)")
+                    logger.debug(
+                        "Replacing anchor at second %d: '%s' (%.2fs) -> '%s' (%.2fs)",
+                        second_index, mapping[second_index], time_tracking[second_index], word, time_end,
+                    )
                 mapping[second_index] = word
                 time_tracking[second_index] = time_end
-                logger.debug(f"Mapped '{word}' at {time_end:.2f}s -> second {second_index}")
+                logger.debug("Mapped '%s' at %.2fs -> second %d", word, time_end, second_index)
         else:
-            logger.debug(f"Anchor '{word}' at {time_end:.2f}s is outside valid range [0, {duration_seconds}), skipping")
+            logger.debug("Anchor '%s' at %.2fs is outside valid range [0, %d), skipping", word, time_end, duration_seconds)
     
     logger.info(f"Mapped {len(mapping)} lyric anchors to seconds (out of {len(anchors)} total anchors)")
-    if mapping:
+    if mapping and logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Mapping details: {dict(sorted(mapping.items()))}")
     return mapping
 
 
-def build_karaoke_mapping(lyrics_json_path: str, duration_seconds: int) -> Dict[int, str]:
+def build_karaoke_mapping(lyrics_json_path: Union[str, "LyricsResult"], duration_seconds: int) -> Dict[int, str]:
     """
     Build a per-second karaoke mapping from lyrics JSON.
     
@@ -306,7 +382,8 @@ def build_karaoke_mapping(lyrics_json_path: str, duration_seconds: int) -> Dict[
     intersects [s, s+1), sorts them by start time, and joins them into a string.
     
     Args:
-        lyrics_json_path: Path to JSON file from detect-lyrics
+        lyrics_json_path: Path to JSON file from detect-lyrics, or a LyricsResult
+            returned by detect_lyrics (its starts/ends/texts arrays are used directly)
         duration_seconds: Total duration of video in seconds
         
     Returns:
@@ -317,51 +394,53 @@ def build_karaoke_mapping(lyrics_json_path: str, duration_seconds: int) -> Dict[
         FileNotFoundError: If lyrics file doesn't exist
         ValueError: If JSON structure is invalid
     """
-    path = Path(lyrics_json_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Lyrics file not found: {lyrics_json_path}")
-    
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in lyrics file: {e}") from e
+    if hasattr(lyrics_json_path, "starts"):
+        starts = lyrics_json_path.starts
+        ends = lyrics_json_path.ends
+        texts = lyrics_json_path.texts
+    else:
+        data = _load_lyrics_json(lyrics_json_path)
+        words = data.get("words", [])
+        starts = np.fromiter((w.get("start", 0.0) for w in words), dtype=np.float64, count=len(words))
+        ends = np.fromiter((w.get("end", 0.0) for w in words), dtype=np.float64, count=len(words))
+        texts = [w.get("word", "") for w in words]
     
-    words = data.get("words", [])
-    if not words:
+    if len(starts) == 0:
         logger.warning("No words found in lyrics file")
         return {}
     
-    logger.info(f"Building karaoke mapping from {len(words)} words for {duration_seconds} seconds")
+    logger.info(f"Building karaoke mapping from {len(starts)} words for {duration_seconds} seconds")
     
-    mapping: Dict[int, str] = {}
+    # A word's [start, end) intersects [s, s+1) for every integer s with
+    # floor(start) <= s <= ceil(end) - 1, so compute each word's second range
+    # directly instead of testing every word against every second
+    first_seconds = np.maximum(np.floor(starts), 0).astype(np.int64)
+    last_seconds = np.minimum(np.ceil(ends) - 1, duration_seconds - 1).astype(np.int64)
     
-    # For each integer second s in [0, duration_seconds)
-    for s in range(duration_seconds):
-        # Collect words whose [start, end) intersects [s, s+1)
-        # A word intersects if: start < s+1 AND end > s
-        words_in_second = []
-        for word_data in words:
-            start = word_data.get("start", 0.0)
-            end = word_data.get("end", 0.0)
-            
-            # Check if word interval [start, end) intersects [s, s+1)
-            if start < s + 1 and end > s:
-                word_text = word_data.get("word", "").strip()
-                if word_text:
-                    words_in_second.append((start, word_text))
-        
-        # Sort words by start time to maintain chronological order
-        words_in_second.sort(key=lambda x: x[0])
-        
+    # Sort once by start (stable) so each bucket fills in chronological order,
+    # and drop words that cover no second in range before the Python loop
+    order = np.argsort(starts, kind="stable")
+    order = order[first_seconds[order] <= last_seconds[order]]
+    
+    buckets: List[List[str]] = [[] for _ in range(duration_seconds)]
+    for i, first, last in zip(order.tolist(), first_seconds[order].tolist(), last_seconds[order].tolist()):
+        word_text = texts[i].strip()
+        if not word_text:
+            continue
+        word_upper = word_text.upper()
+        for s in range(first, last + 1):
+            buckets[s].append(word_upper)
+    
+    mapping: Dict[int, str] = {}
+    for s, bucket in enumerate(buckets):
         # Join words into uppercase string
-        if words_in_second:
-            text_line = " ".join(word_text.upper() for _, word_text in words_in_second)
+        if bucket:
+            text_line = " ".join(bucket)
             mapping[s] = text_line
-            logger.debug(f"Second {s}: '{text_line}' ({len(words_in_second)} words)")
+            logger.debug("Second %d: '%s' (%d words)", s, text_line, len(bucket))
     
     logger.info(f"Built karaoke mapping: {len(mapping)} seconds have lyrics out of {duration_seconds} total")
-    if mapping:
+    if mapping and logger.isEnabledFor(logging.DEBUG):
         sample_seconds = sorted(mapping.keys())[:5]
         logger.debug(f"Sample mappings: {[(s, mapping[s][:30] + '...' if len(mapping[s]) > 30 else mapping[s]) for s in sample_seconds]}")
     
@@ -10,16 +10,34 @@ This module orchestrates the complete video rendering pipeline:
 """
 
 import os
+import random
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
-from moviepy import VideoFileClip, AudioFileClip  # type: ignore
+import librosa
+import numpy as np
 
-from audiogiphy.audio_analysis import analyze_bpm_per_second, analyze_global_bpm
-from audiogiphy.visual_builder import build_visual_track, _subclip, _set_duration, _set_audio, _add_watermark
-from audiogiphy.config import DEFAULT_FPS, DEFAULT_RESOLUTION, CHECKPOINTS_DIR
+from audiogiphy.audio_analysis import (
+    analyze_bpm_segments,
+    bpm_timeline_from_segments,
+    global_bpm_from_segments,
+)
+from audiogiphy.visual_builder import (
+    build_visual_track,
+    _list_source_videos,
+    _probe_sources,
+    _render_watermark_image,
+)
+from audiogiphy.config import (
+    DEFAULT_RESOLUTION,
+    CHECKPOINTS_DIR,
+    FINAL_X264_PRESET,
+    FINAL_X264_CRF,
+    FINAL_USE_NVENC,
+)
 from audiogiphy.lyrics_overlays import extract_lyric_anchors, map_anchors_to_seconds, build_karaoke_mapping
 from audiogiphy.giphy_client import GiphyClient
 from audiogiphy.lyrics_giphy_planner import plan_giphy_segments
@@ -29,6 +47,46 @@ __all__ = ["render_video"]
 logger = logging.getLogger("audiogiphy.render_pipeline")
 
 
+def _nvenc_available() -> bool:
+    """
+    Check whether the ffmpeg on PATH was built with the h264_nvenc encoder.
+    
+    Returns:
+        True if h264_nvenc is listed by ffmpeg -encoders
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], check=True, capture_output=True, text=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+    return "h264_nvenc" in result.stdout
+
+
+def _final_video_codec_args() -> List[str]:
+    """
+    Video encoder options for the final watermark overlay pass.
+    
+    The overlay changes every frame, so the final pass has to re-encode; a
+    fast x264 preset at a low CRF keeps that cheap without visible loss.
+    NVENC is used instead only when FINAL_USE_NVENC is set and available.
+    
+    Returns:
+        ffmpeg arguments selecting and configuring the video encoder
+    """
+    if FINAL_USE_NVENC:
+        if _nvenc_available():
+            logger.info("Encoding final output with h264_nvenc")
+            return ["-c:v", "h264_nvenc", "-preset", "p1"]
+        logger.warning("FINAL_USE_NVENC is set but ffmpeg has no h264_nvenc encoder, using libx264")
+    return [
+        "-c:v", "libx264",
+        "-preset", FINAL_X264_PRESET,
+        "-crf", str(FINAL_X264_CRF),
+        "-threads", str(os.cpu_count() or 4),
+    ]
+
+
 def render_video(
     audio_path: str,
     video_folder: str,
@@ -54,7 +112,7 @@ def render_video(
     (e.g., 48+ minutes) without running out of memory by:
     - Writing clips to disk immediately
     - Using ffmpeg stream copy for concatenation (no re-encoding)
-    - Only loading one VideoFileClip at a time (the final concatenated video)
+    - Attaching audio and the watermark in one ffmpeg pass (no frames decoded into Python)
     
     Args:
         audio_path: Path to input audio file
@@ -72,10 +130,6 @@ def render_video(
         RuntimeError: If ffmpeg is not found or concatenation fails
         ValueError: If number of generated clips doesn't match duration
     """
-    import random
-    import numpy as np
-    import librosa
-    
     logger.info("Starting video render pipeline")
     
     if seed is not None:
@@ -89,11 +143,18 @@ def render_video(
         logger.warning(f"Audio duration ({audio_duration:.1f}s) is shorter than requested ({duration_seconds}s). Clamping to audio duration.")
         duration_seconds = int(audio_duration)
     
-    # Step 1: Analyze audio BPM
+    # Step 1: Analyze audio BPM and probe the source videos in the background
+    # while lyrics and GIPHY planning run below; the results are first needed
+    # by build_visual_track
     logger.info("Analyzing audio BPM")
-    bpm_values = analyze_bpm_per_second(audio_path, duration_seconds)
-    base_bpm = analyze_global_bpm(audio_path, duration_seconds)
-    logger.info(f"Base BPM: {base_bpm:.1f}")
+    # The per-second timeline and the base BPM both come from one segment
+    # analysis, so it is only submitted once
+    prefetch = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audiogiphy-prefetch")
+    segments_future = prefetch.submit(analyze_bpm_segments, audio_path)
+    probe_future = None
+    folder = Path(video_folder)
+    if folder.is_dir():
+        probe_future = prefetch.submit(_probe_sources, _list_source_videos(folder))
     
     # Process lyrics if provided
     lyrics_mapping = None
@@ -140,18 +201,17 @@ def render_video(
         logger.info(f"GIPHY plan JSON path: {lyrics_giphy_plan_path}")
         try:
             # Initialize GIPHY client (reads API key from environment)
-            giphy_client = GiphyClient()
-            
-            if giphy_client.placeholder_mode:
-                logger.warning("GIPHY_API_KEY not set, skipping GIPHY overlay planning")
-                giphy_segment_plan = None
-            else:
-                # Plan GIPHY segments (deduplicates queries, calls API, builds mapping)
-                giphy_segment_plan = plan_giphy_segments(lyrics_giphy_plan_path, giphy_client)
-                logger.info(f"Built GIPHY plan for {len(giphy_segment_plan)} segments")
-                if giphy_segment_plan:
-                    sample_segments = list(giphy_segment_plan.items())[:3]
-                    logger.debug(f"Sample GIPHY segments: {[(sid, plan['gif_query'], len(plan['gif_urls'])) for sid, plan in sample_segments]}")
+            with GiphyClient() as giphy_client:
+                if giphy_client.placeholder_mode:
+                    logger.warning("GIPHY_API_KEY not set, skipping GIPHY overlay planning")
+                    giphy_segment_plan = None
+                else:
+                    # Plan GIPHY segments (deduplicates queries, calls API, builds mapping)
+                    giphy_segment_plan = plan_giphy_segments(lyrics_giphy_plan_path, giphy_client)
+                    logger.info(f"Built GIPHY plan for {len(giphy_segment_plan)} segments")
+                    if giphy_segment_plan:
+                        sample_segments = list(giphy_segment_plan.items())[:3]
+                        logger.debug(f"Sample GIPHY segments: {[(sid, plan['gif_query'], len(plan['gif_urls'])) for sid, plan in sample_segments]}")
         except FileNotFoundError as e:
             logger.warning(f"GIPHY plan file not found: {e}, continuing without GIPHY overlays")
             giphy_segment_plan = None
@@ -159,6 +219,16 @@ def render_video(
             logger.warning(f"Failed to load GIPHY plan: {e}, continuing without GIPHY overlays", exc_info=True)
             giphy_segment_plan = None
     
+    try:
+        bpm_segments = segments_future.result()
+        source_info = probe_future.result() if probe_future is not None else None
+    finally:
+        prefetch.shutdown(wait=False, cancel_futures=True)
+    logger.info(f"Found {len(bpm_segments)} BPM segments")
+    bpm_values = bpm_timeline_from_segments(bpm_segments, duration_seconds)
+    base_bpm = global_bpm_from_segments(bpm_segments)
+    logger.info(f"Base BPM: {base_bpm:.1f}")
+    
     # Step 2: Build visual track (generates 1-second clips on disk)
     logger.info("Generating 1s clips")
     checkpoint_dir = Path(output_path).parent / CHECKPOINTS_DIR / Path(output_path).stem
@@ -172,6 +242,7 @@ def render_video(
         lyrics_mapping=lyrics_mapping,
         karaoke_mapping=karaoke_mapping,
         giphy_segment_plan=giphy_segment_plan,
+        source_info=source_info,
     )
 
     if len(clip_paths) != duration_seconds:
@@ -181,19 +252,25 @@ def render_video(
     visuals_raw_path = checkpoint_dir / "visuals_raw.mp4"
     concat_list_path = checkpoint_dir / "concat_list.txt"
 
-    # Create ffmpeg concat list file
-    with open(concat_list_path, 'w') as f:
-        for clip_path in clip_paths:
-            abs_path = clip_path.resolve()
-            f.write(f"file '{abs_path}'\n")
+    # build_visual_track writes the concat list as clips complete; only rebuild
+    # it if it is missing or out of step. The concat demuxer resolves relative
+    # entries against the list's own directory, where every clip lives, so
+    # bare filenames need no per-path resolve() and never need quote escaping
+    if not concat_list_path.is_file() or concat_list_path.read_text().count("\n") != len(clip_paths):
+        concat_list_path.write_text("".join(f"file '{p.name}'\n" for p in clip_paths))
 
     # Use ffmpeg concat demuxer (stream copy, no re-encoding = fast and memory-efficient)
     ffmpeg_logger = logging.getLogger("ffmpeg")
     try:
         ffmpeg_logger.info("Concatenating clips")
+        # Only errors are piped back (no banner, per-frame stats or stdout),
+        # so the captured stderr stays small however long the concat runs
         subprocess.run(
             [
                 "ffmpeg",
+                "-hide_banner",
+                "-loglevel", "error",
+                "-nostats",
                 "-f", "concat",
                 "-safe", "0",
                 "-i", str(concat_list_path),
@@ -202,7 +279,8 @@ def render_video(
                 "-y",  # Overwrite output file
             ],
             check=True,
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
         )
         ffmpeg_logger.info("Concatenation completed")
     except subprocess.CalledProcessError as e:
@@ -211,36 +289,46 @@ def render_video(
     except FileNotFoundError:
         raise RuntimeError("ffmpeg not found. Please install ffmpeg to use this script.")
 
-    # Step 4: Load audio and attach to video
+    # Step 4: Attach audio and watermark in a single ffmpeg pass
     logger.info("Attaching audio")
     if not Path(audio_path).exists():
         raise FileNotFoundError(f"Audio not found: {audio_path}")
 
-    audio = _subclip(AudioFileClip(audio_path), 0, duration_seconds)
-
-    logger.info("Writing final output")
-    # Load the concatenated video once (only one VideoFileClip in memory)
-    visual = VideoFileClip(str(visuals_raw_path), audio=False)
-
-    # Add watermark to the final video (applied once to entire video)
+    # Render the watermark once as a PNG and let ffmpeg's overlay filter
+    # composite it while encoding, instead of decoding every frame into Python
     logger.info("Adding watermark overlay")
-    visual = _add_watermark(visual, resolution)
+    watermark_path = checkpoint_dir / "watermark.png"
+    watermark_position = _render_watermark_image(resolution, watermark_path)
 
-    # Attach audio and write final output
-    final = _set_duration(_set_audio(visual, audio), duration_seconds)
-    final.write_videofile(
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostats", "-y", "-i", str(visuals_raw_path), "-i", audio_path]
+    if watermark_position is not None:
+        x, y = watermark_position
+        command += [
+            "-i", str(watermark_path),
+            "-filter_complex", f"[0:v][2:v]overlay={x}:{y}[v]",
+            "-map", "[v]",
+            *_final_video_codec_args(),
+            "-pix_fmt", "yuv420p",
+        ]
+    else:
+        logger.warning("Writing final output without watermark overlay")
+        # Nothing to draw, so the concatenated clips can be copied as-is
+        command += ["-map", "0:v", "-c:v", "copy"]
+    command += [
+        "-map", "1:a:0",
+        "-c:a", "aac",
+        "-t", str(duration_seconds),
         output_path,
-        codec="libx264",
-        audio_codec="aac",
-        fps=DEFAULT_FPS,
-        threads=os.cpu_count() or 4,
-        preset="medium",
-    )
+    ]
 
-    # Cleanup
-    visual.close()
-    audio.close()
-    final.close()
+    logger.info("Writing final output")
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else "Unknown error"
+        raise RuntimeError(f"ffmpeg final mux failed: {error_msg}") from e
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found. Please install ffmpeg to use this script.")
 
     logger.info("Render complete!")
     logger.info(f"Final output: {output_path}")
@@ -5,18 +5,31 @@ This module handles building the visual track by processing video clips,
 applying BPM-based speed changes, resizing, and writing 1-second segments to disk.
 """
 
-from typing import List, Tuple, Set, Dict, Any, Optional
+from typing import List, Tuple, Set, Dict, Any, Optional, Sequence
 import json
+import functools
 import random
 import logging
 import tempfile
 import os
 import hashlib
+import warnings
+import subprocess
+import multiprocessing
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import numpy as np
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
 
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     # MoviePy v2 style imports
     from moviepy import (
@@ -26,6 +39,7 @@ try:
         vfx,
         TextClip,
         ColorClip,
+        ImageClip,
     )
 except Exception:  # pragma: no cover - fallback for older MoviePy
     # MoviePy v1 style imports
@@ -36,14 +50,28 @@ except Exception:  # pragma: no cover - fallback for older MoviePy
         vfx,
         TextClip,
         ColorClip,
+        ImageClip,
     )
 
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+try:
+    from moviepy.config import FFMPEG_BINARY
+except ImportError:  # pragma: no cover - MoviePy v1
+    from moviepy.config import get_setting
+    FFMPEG_BINARY = get_setting("FFMPEG_BINARY")
+
 from audiogiphy.config import (
     DEFAULT_FPS,
     CLIP_DURATION_SECONDS,
     BASE_WINDOW_SECONDS,
     CHECKPOINT_INTERVAL,
+    CHECKPOINT_COMPACT_INTERVAL,
     CHECKPOINTS_DIR,
+    CLIP_X264_PRESET,
+    VISUAL_BUILD_WORKERS,
+    VISUAL_ENCODER_THREADS,
+    VISUAL_PROBE_THREADS,
     LYRICS_FONT_SIZE,
     LYRICS_KARAOKE_FONT_SIZE,
     LYRICS_TEXT_COLOR,
@@ -64,6 +92,9 @@ from audiogiphy.config import (
 
 logger = logging.getLogger("audiogiphy.visual_builder")
 
+# x264 threading stops paying off beyond this for 1-second clips
+_MAX_ENCODER_THREADS = 4
+
 
 def _resize_letterbox(
     clip: VideoFileClip,
@@ -73,7 +104,15 @@ def _resize_letterbox(
     Resize a clip to the target resolution with letterboxing while keeping aspect ratio.
 
     This function is compatible with both MoviePy v1 (resize) and v2 (resized).
+    
+    Deprecated: clips are now letterboxed inside ffmpeg with the filter from
+    _letterbox_filter; this is kept only for callers that must stay in MoviePy.
     """
+    warnings.warn(
+        "_resize_letterbox is deprecated; use the _letterbox_filter ffmpeg filter instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     target_w, target_h = target_resolution
 
     # Try to get size; fall back to target_resolution if missing
@@ -136,6 +175,13 @@ def _set_duration(clip: VideoFileClip, duration: float) -> VideoFileClip:
     return clip.with_duration(duration)  # type: ignore[attr-defined]
 
 
+def _set_position(clip: VideoFileClip, position: Tuple[int, int]) -> VideoFileClip:
+    """Set the position of a clip in a MoviePy v1/v2 compatible way."""
+    if hasattr(clip, "set_position"):
+        return clip.set_position(position)  # type: ignore[attr-defined]
+    return clip.with_position(position)  # type: ignore[attr-defined]
+
+
 def _subclip(
     clip: VideoFileClip,
     start: float,
@@ -182,6 +228,273 @@ def _create_black_frame(
     return _set_duration(clip, duration)
 
 
+def _run_ffmpeg(args: List[str]) -> None:
+    """
+    Run ffmpeg with the given arguments.
+    
+    Raises:
+        RuntimeError: If ffmpeg exits with an error (message is its stderr)
+    """
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(message or f"ffmpeg exited with code {result.returncode}")
+
+
+def _probe_source(video_path: Path) -> Tuple[float, int, int]:
+    """
+    Read a video's duration and frame size from its container header.
+    
+    Raises:
+        ValueError: If the duration is missing or not positive
+    """
+    infos = ffmpeg_parse_infos(str(video_path))
+    duration = infos.get("duration")
+    if duration is None or duration <= 0:
+        raise ValueError(f"Invalid duration: {duration}")
+    width, height = infos.get("video_size") or (0, 0)
+    return float(duration), int(width), int(height)
+
+
+@dataclass(frozen=True, slots=True)
+class SourceCache:
+    """
+    Probed metadata for bank videos as parallel arrays (one row per source).
+    
+    Attributes:
+        paths: Source video paths
+        durations: Durations in seconds (float64)
+        widths: Frame widths in pixels (int32)
+        heights: Frame heights in pixels (int32)
+    """
+    paths: List[Path]
+    durations: np.ndarray
+    widths: np.ndarray
+    heights: np.ndarray
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[Path, Tuple[float, int, int]]]) -> "SourceCache":
+        """Build a cache from (path, (duration, width, height)) rows."""
+        return cls(
+            paths=[path for path, _ in rows],
+            durations=np.array([info[0] for _, info in rows], dtype=np.float64),
+            widths=np.array([info[1] for _, info in rows], dtype=np.int32),
+            heights=np.array([info[2] for _, info in rows], dtype=np.int32),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def select(self, paths: Sequence[Path]) -> "SourceCache":
+        """Rows for the given paths, in that order; paths not in the cache are skipped."""
+        index = {path: i for i, path in enumerate(self.paths)}
+        rows = np.array([index[p] for p in paths if p in index], dtype=np.intp)
+        return SourceCache(
+            paths=[self.paths[i] for i in rows.tolist()],
+            durations=self.durations[rows],
+            widths=self.widths[rows],
+            heights=self.heights[rows],
+        )
+    
+    def merged(self, other: "SourceCache") -> "SourceCache":
+        """Rows of this cache followed by the rows of another."""
+        return SourceCache(
+            paths=self.paths + other.paths,
+            durations=np.concatenate([self.durations, other.durations]),
+            widths=np.concatenate([self.widths, other.widths]),
+            heights=np.concatenate([self.heights, other.heights]),
+        )
+
+
+def _probe_sources(video_paths: List[Path]) -> SourceCache:
+    """
+    Probe every source video once, concurrently.
+    
+    Probing only reads container headers in ffmpeg subprocesses, so threads
+    overlap the process startup and disk reads.
+    
+    Args:
+        video_paths: Source videos to probe
+        
+    Returns:
+        SourceCache with a row per readable video, in input order; videos
+        that fail to probe are left out
+    """
+    def probe(video_path: Path) -> Tuple[Path, Tuple[float, int, int] | None]:
+        try:
+            return video_path, _probe_source(video_path)
+        except Exception as e:
+            logger.warning(f"Failed to load video {video_path}: {e}")
+            return video_path, None
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(VISUAL_PROBE_THREADS, len(video_paths)))) as pool:
+        results = list(pool.map(probe, video_paths))
+    return SourceCache.from_rows([(path, info) for path, info in results if info is not None])
+
+
+def _letterbox_filter(
+    resolution: Tuple[int, int],
+    source_size: Tuple[int, int] | None = None,
+) -> str:
+    """
+    Build the ffmpeg filter that letterboxes a video to the target resolution.
+    
+    Scales to fit while keeping the aspect ratio, then pads with black to
+    exactly the target size, all inside libavfilter.
+    
+    Args:
+        resolution: Output resolution (width, height)
+        source_size: Input frame size (width, height) if known; when it already
+                     matches the resolution the scale and pad steps are skipped
+        
+    Returns:
+        Filter chain string for -vf / -filter_complex
+    """
+    w, h = resolution
+    if source_size is not None and tuple(source_size) == (w, h):
+        return "setsar=1"
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:color=black,setsar=1"
+    )
+
+
+def _encode_clip(
+    input_args: List[str],
+    output_path: Path,
+    resolution: Tuple[int, int],
+    speed: float,
+    encoder_threads: int,
+    source_size: Tuple[int, int] | None = None,
+) -> None:
+    """
+    Encode a 1-second letterboxed clip with a single ffmpeg process.
+    
+    Speed change, letterbox resize and padding to exactly one second all run
+    inside ffmpeg's filtergraph, so no frames pass through Python.
+    
+    Args:
+        input_args: ffmpeg input options ending with "-i <source>"
+        output_path: Where to write the MP4
+        resolution: Output resolution (width, height)
+        speed: Playback speed factor
+        encoder_threads: x264 threads for this encode
+        source_size: Input frame size (width, height) if known, see _letterbox_filter
+    
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    # Write beside the target and rename when done, so a clip file that
+    # exists is always complete even if the render was killed mid-encode
+    partial_path = output_path.with_name(output_path.name + ".part")
+    video_filter = (
+        f"setpts=(PTS-STARTPTS)/{speed:.6f},"
+        f"{_letterbox_filter(resolution, source_size)},"
+        f"fps={DEFAULT_FPS},"
+        # Hold the last frame if a fast-forwarded window runs out early
+        f"tpad=stop_mode=clone:stop_duration={CLIP_DURATION_SECONDS}"
+    )
+    _run_ffmpeg([
+        *input_args,
+        "-vf", video_filter,
+        # Count frames rather than time so every clip has exactly the same length
+        "-frames:v", str(round(CLIP_DURATION_SECONDS * DEFAULT_FPS)),
+        "-an",
+        # Always re-encode, even when a source already matches: render_video
+        # joins the clips with the concat demuxer and -c copy, which needs every
+        # clip to share one set of H.264 parameters, timebase and frame rate.
+        # A stream-copied cut would also start on the source's keyframe rather
+        # than at start_time and not be exactly one second long
+        "-c:v", "libx264",
+        "-preset", CLIP_X264_PRESET,
+        "-pix_fmt", "yuv420p",
+        "-threads", str(encoder_threads),
+        "-f", "mp4",
+        str(partial_path),
+    ])
+    os.replace(partial_path, output_path)
+
+
+def _encode_black_clip(output_path: Path, resolution: Tuple[int, int], encoder_threads: int) -> None:
+    """Encode a 1-second black placeholder clip."""
+    w, h = resolution
+    _encode_clip(
+        ["-f", "lavfi", "-i", f"color=c=black:s={w}x{h}:r={DEFAULT_FPS}"],
+        output_path,
+        resolution,
+        1.0,
+        encoder_threads,
+        source_size=resolution,
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _render_text_bitmap(
+    text: str,
+    font_size: int,
+    color: str,
+    stroke_color: str | None = None,
+    stroke_width: int = 0,
+    font: str | None = None,
+    caption_width: int | None = None,
+) -> np.ndarray:
+    """
+    Rasterize text once into an RGBA array, cached by its render parameters.
+    
+    TextClip runs Pillow's font shaping and rasterization every time it is
+    built; lyrics and the watermark repeat the same strings, so overlays wrap
+    the cached bitmap in a cheap ImageClip instead.
+    
+    Args:
+        text: Text to render
+        font_size: Font size in points
+        color: Fill color
+        stroke_color: Outline color, or None for no outline
+        stroke_width: Outline width in pixels
+        font: Font name or path, or None for the default font
+        caption_width: Wrap the text to this width in pixels (caption mode),
+                       or None to render a single label line
+        
+    Returns:
+        Read-only uint8 array of shape (height, width, 4)
+        
+    Raises:
+        Exception: Whatever TextClip raises if the text cannot be rendered
+    """
+    kwargs: Dict[str, Any] = dict(
+        text=text,  # Use text= keyword argument for MoviePy v2
+        font_size=font_size,
+        color=color,
+        stroke_color=stroke_color,
+        stroke_width=stroke_width,
+        font=font,
+    )
+    if caption_width is None:
+        txt_clip = TextClip(**kwargs)
+    else:
+        try:
+            txt_clip = TextClip(**kwargs, method="caption", size=(caption_width, None))
+        except (TypeError, ValueError):
+            # Some MoviePy versions use a different signature for TextClip
+            txt_clip = TextClip(**kwargs)
+    
+    rgb = txt_clip.get_frame(0)
+    if txt_clip.mask is None:
+        alpha = np.full(rgb.shape[:2], 255, dtype=np.uint8)
+    else:
+        alpha = np.clip(np.rint(txt_clip.mask.get_frame(0) * 255), 0, 255).astype(np.uint8)
+    txt_clip.close()
+    
+    bitmap = np.dstack([rgb.astype(np.uint8), alpha])
+    # Shared by every caller through the cache, so it must never be mutated
+    bitmap.flags.writeable = False
+    return bitmap
+
+
 def _measure_text_size(text_clip: TextClip) -> Tuple[int, int]:
     """
     Attempt to measure text size in a way compatible with MoviePy v1 and v2.
@@ -201,6 +514,32 @@ def _measure_text_size(text_clip: TextClip) -> Tuple[int, int]:
     return 100, 50
 
 
+def _composite_lyrics(
+    clip: VideoFileClip,
+    overlays: List[VideoFileClip],
+    kind: str,
+) -> VideoFileClip:
+    """
+    Composite positioned lyric layers over a 1-second clip.
+    
+    Shared by the phrase and karaoke overlays; returns the clip unchanged if
+    there is nothing to draw or compositing fails.
+    
+    Args:
+        clip: Base video clip
+        overlays: Layers with duration and position already set, bottom first
+        kind: Overlay name for log messages ("lyrics" or "karaoke")
+    """
+    if not overlays:
+        return clip
+    try:
+        composed = CompositeVideoClip([clip] + overlays)
+        return _set_duration(composed, CLIP_DURATION_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to composite {kind} overlay: {e}")
+        return clip
+
+
 def _add_text_overlay(
     clip: VideoFileClip,
     text: str,
@@ -209,32 +548,23 @@ def _add_text_overlay(
     """
     Add a text overlay to a video clip for 1 second (phrase-ending word mode).
     """
+    # Blank or punctuation-only entries would rasterize nothing visible
+    if not any(c.isalnum() for c in text):
+        return clip
+
     width, height = resolution
 
     # Create text clip with safe defaults
     try:
-        txt_clip = TextClip(
-            text=text,  # Use text= keyword argument for MoviePy v2
-            font_size=LYRICS_FONT_SIZE,
-            color=LYRICS_TEXT_COLOR,
-            stroke_color=LYRICS_STROKE_COLOR,
-            stroke_width=LYRICS_STROKE_WIDTH,
-            method="caption",
-            size=(int(width * 0.85), None),  # 85% of width for text wrapping
+        bitmap = _render_text_bitmap(
+            text,
+            LYRICS_FONT_SIZE,
+            LYRICS_TEXT_COLOR,
+            LYRICS_STROKE_COLOR,
+            LYRICS_STROKE_WIDTH,
+            caption_width=int(width * 0.85),  # 85% of width for text wrapping
         )
-    except TypeError:
-        # Some MoviePy versions use a different signature for TextClip
-        try:
-            txt_clip = TextClip(
-                text=text,  # Use text= keyword argument for MoviePy v2
-                font_size=LYRICS_FONT_SIZE,
-                color=LYRICS_TEXT_COLOR,
-                stroke_color=LYRICS_STROKE_COLOR,
-                stroke_width=LYRICS_STROKE_WIDTH,
-            )
-        except Exception as e:
-            logger.warning(f"Failed to create TextClip for lyrics: {e}")
-            return clip
+        txt_clip = ImageClip(bitmap)
     except Exception as e:
         logger.warning(f"Failed to create TextClip for lyrics: {e}")
         return clip
@@ -272,23 +602,13 @@ def _add_text_overlay(
 
     # Set duration and position
     try:
-        txt_clip = _set_duration(txt_clip, CLIP_DURATION_SECONDS)
-        if hasattr(txt_clip, "set_position"):
-            txt_clip = txt_clip.set_position((x_left, y_top))  # type: ignore[attr-defined]
-        else:
-            txt_clip = txt_clip.with_position((x_left, y_top))  # type: ignore[attr-defined]
+        txt_clip = _set_position(_set_duration(txt_clip, CLIP_DURATION_SECONDS), (x_left, y_top))
     except Exception as e:
         logger.warning(f"Failed to configure TextClip duration/position: {e}")
         return clip
 
     # Compose text over original clip
-    try:
-        composed = CompositeVideoClip([clip, txt_clip])
-        composed = _set_duration(composed, CLIP_DURATION_SECONDS)
-        return composed
-    except Exception as e:
-        logger.warning(f"Failed to composite TextClip onto video: {e}")
-        return clip
+    return _composite_lyrics(clip, [txt_clip], "lyrics")
 
 
 def _add_karaoke_overlay(
@@ -355,27 +675,15 @@ def _add_karaoke_overlay(
 
     for i, line in enumerate(lines):
         try:
-            txt_clip = TextClip(
-                text=line,  # Use text= keyword argument for MoviePy v2
-                font_size=LYRICS_KARAOKE_FONT_SIZE,
-                color=LYRICS_TEXT_COLOR,
-                stroke_color=LYRICS_STROKE_COLOR,
-                stroke_width=LYRICS_STROKE_WIDTH,
-                method="caption",
-                size=(int(width * 0.9), None),
+            bitmap = _render_text_bitmap(
+                line,
+                LYRICS_KARAOKE_FONT_SIZE,
+                LYRICS_TEXT_COLOR,
+                LYRICS_STROKE_COLOR,
+                LYRICS_STROKE_WIDTH,
+                caption_width=int(width * 0.9),
             )
-        except (TypeError, ValueError):
-            try:
-                txt_clip = TextClip(
-                    text=line,  # Use text= keyword argument for MoviePy v2
-                    font_size=LYRICS_KARAOKE_FONT_SIZE,
-                    color=LYRICS_TEXT_COLOR,
-                    stroke_color=LYRICS_STROKE_COLOR,
-                    stroke_width=LYRICS_STROKE_WIDTH,
-                )
-            except Exception as e:
-                logger.warning(f"Failed to create karaoke TextClip for line '{line}': {e}")
-                continue
+            txt_clip = ImageClip(bitmap)
         except Exception as e:
             logger.warning(f"Failed to create karaoke TextClip for line '{line}': {e}")
             continue
@@ -392,12 +700,7 @@ def _add_karaoke_overlay(
             break
 
         try:
-            txt_clip = _set_duration(txt_clip, CLIP_DURATION_SECONDS)
-            if hasattr(txt_clip, "set_position"):
-                txt_clip = txt_clip.set_position((x_left, y_top))  # type: ignore[attr-defined]
-            else:
-                txt_clip = txt_clip.with_position((x_left, y_top))  # type: ignore[attr-defined]
-            text_clips.append(txt_clip)
+            text_clips.append(_set_position(_set_duration(txt_clip, CLIP_DURATION_SECONDS), (x_left, y_top)))
         except Exception as e:
             logger.warning(f"Failed to configure karaoke text clip: {e}")
             continue
@@ -406,26 +709,13 @@ def _add_karaoke_overlay(
     overlays: List[VideoFileClip] = []
     if band_clip is not None:
         try:
-            if hasattr(band_clip, "set_position"):
-                band_clip = band_clip.set_position((0, band_y_top))  # type: ignore[attr-defined]
-            else:
-                band_clip = band_clip.with_position((0, band_y_top))  # type: ignore[attr-defined]
-            overlays.append(band_clip)
+            overlays.append(_set_position(band_clip, (0, band_y_top)))
         except Exception as e:
             logger.warning(f"Failed to position karaoke band clip: {e}")
 
     overlays.extend(text_clips)
 
-    if not overlays:
-        return clip
-
-    try:
-        composed = CompositeVideoClip([clip] + overlays)
-        composed = _set_duration(composed, CLIP_DURATION_SECONDS)
-        return composed
-    except Exception as e:
-        logger.warning(f"Failed to composite karaoke overlay: {e}")
-        return clip
+    return _composite_lyrics(clip, overlays, "karaoke")
 
 
 def _download_giphy_gif(gif_url: str, cache_dir: Path) -> Optional[Path]:
@@ -443,7 +733,7 @@ def _download_giphy_gif(gif_url: str, cache_dir: Path) -> Optional[Path]:
 
         # If already cached, return existing path
         if cache_path.exists():
-            logger.debug(f"Using cached GIPHY file for URL {gif_url}")
+            logger.debug("Using cached GIPHY file for URL %s", gif_url)
             return cache_path
 
         # Lazy import to avoid unnecessary dependency in some environments
@@ -469,58 +759,6 @@ def _download_giphy_gif(gif_url: str, cache_dir: Path) -> Optional[Path]:
         return None
 
 
-def _load_giphy_as_base_clip(
-    gif_mp4_path: str,
-    resolution: Tuple[int, int],
-    speed: float = 1.0,
-) -> VideoFileClip | None:
-    """
-    Load a GIPHY MP4/GIF clip and make it full-screen (same size as dance visuals).
-    Letterboxes to match target resolution, applies speed adjustment, and sets duration to 1 second.
-    
-    Args:
-        gif_mp4_path: Local path to GIPHY MP4/GIF file
-        resolution: Target resolution (width, height)
-        speed: Speed multiplier (for BPM sync)
-        
-    Returns:
-        VideoFileClip ready to use as base clip, or None if loading fails
-    """
-    try:
-        width, height = resolution
-        
-        # Load GIF/MP4 as video clip
-        gif_clip = VideoFileClip(gif_mp4_path, audio=False)
-        
-        # Apply speed change (if needed)
-        if speed != 1.0:
-            gif_clip = _speedx(gif_clip, speed)
-        
-        # Resize with letterbox to target resolution (same as dance visuals)
-        boxed = _resize_letterbox(gif_clip, resolution)
-        
-        # Set duration to exactly 1 second (loop if needed)
-        gif_duration = getattr(boxed, 'duration', None) or 1.0
-        if gif_duration < CLIP_DURATION_SECONDS:
-            # Loop the GIF to match clip duration by concatenating copies
-            try:
-                from moviepy import concatenate_videoclips  # type: ignore
-                num_loops = int(CLIP_DURATION_SECONDS / gif_duration) + 1
-                looped_clips = [boxed] * num_loops
-                result = concatenate_videoclips(looped_clips).with_duration(CLIP_DURATION_SECONDS)
-            except Exception:
-                # Fallback: just extend duration (will freeze on last frame)
-                result = boxed.with_duration(CLIP_DURATION_SECONDS)
-        else:
-            result = _set_duration(boxed, CLIP_DURATION_SECONDS)
-        
-        logger.debug(f"Loaded GIPHY as base clip: {gif_mp4_path}, size={result.size if hasattr(result, 'size') else 'N/A'}")
-        return result
-    except Exception as e:
-        logger.warning(f"Failed to load GIPHY as base clip from {gif_mp4_path}: {e}", exc_info=True)
-        return None
-
-
 def _add_giphy_overlay(
     base_clip: VideoFileClip,
     gif_mp4_path: str,
@@ -597,10 +835,7 @@ def _add_giphy_overlay(
         y_position = max(0, y_position)
         
         # Set clip position
-        if hasattr(gif_clip, "set_position"):
-            gif_clip = gif_clip.set_position((x_position, y_position))  # type: ignore[attr-defined]
-        else:
-            gif_clip = gif_clip.with_position((x_position, y_position))  # type: ignore[attr-defined]
+        gif_clip = _set_position(gif_clip, (x_position, y_position))
         
         # Get base clip size
         base_size = getattr(base_clip, 'size', None) or resolution
@@ -609,7 +844,7 @@ def _add_giphy_overlay(
         result = CompositeVideoClip([base_clip, gif_clip], size=base_size)
         result = result.with_duration(clip_duration)
         
-        logger.debug(f"Added GIPHY overlay: size={overlay_width}x{overlay_height}, position=({x_position}, {y_position})")
+        logger.debug("Added GIPHY overlay: size=%dx%d, position=(%d, %d)", overlay_width, overlay_height, x_position, y_position)
         
         # NOTE: Do NOT close gif_clip here - it's part of the composite and needs to remain open
         # until the composite is written. MoviePy will handle cleanup automatically.
@@ -624,70 +859,168 @@ def _add_giphy_overlay(
         return base_clip
 
 
-def _add_watermark(
-    clip: VideoFileClip,
+@functools.lru_cache(maxsize=1)
+def _resolve_watermark_font() -> str | None:
+    """
+    Find the first font that can render the watermark, once per process.
+    
+    Raises:
+        RuntimeError: If no font can render the watermark text
+    """
+    # Try multiple fonts for watermark
+    watermark_fonts = ["Arial", "Helvetica", "DejaVu-Sans", "Arial-Bold", "Helvetica-Bold", "DejaVu-Sans-Bold"]
+    
+    for font_name in watermark_fonts + [None]:
+        try:
+            # Rendering here also fills the bitmap cache for _watermark_bitmap
+            _render_text_bitmap(WATERMARK_TEXT, WATERMARK_FONT_SIZE, WATERMARK_TEXT_COLOR, font=font_name)
+            logger.debug("Successfully created watermark text clip with font: %s", font_name)
+            return font_name
+        except Exception as e:
+            logger.debug("Font %s failed for watermark: %s, trying next", font_name, e)
+    
+    raise RuntimeError("Failed to create watermark text clip with any method")
+
+
+def _watermark_bitmap() -> np.ndarray:
+    """Cached RGBA rendering of the watermark text (see _render_text_bitmap)."""
+    return _render_text_bitmap(
+        WATERMARK_TEXT, WATERMARK_FONT_SIZE, WATERMARK_TEXT_COLOR, font=_resolve_watermark_font()
+    )
+
+
+def _watermark_position(text_size: Tuple[int, int], resolution: Tuple[int, int]) -> Tuple[int, int]:
+    """Top-left position of the watermark, inset from the bottom-right corner."""
+    width, height = resolution
+    txt_w, txt_h = text_size
+    x_position = max(0, width - txt_w - WATERMARK_MARGIN_RIGHT)
+    y_position = max(0, height - txt_h - WATERMARK_MARGIN_BOTTOM)
+    return x_position, y_position
+
+
+def _render_watermark_image(
     resolution: Tuple[int, int],
-) -> VideoFileClip:
+    output_path: Path,
+) -> Tuple[int, int] | None:
     """
-    Add a watermark overlay to a video clip.
+    Render the watermark once to an RGBA PNG for ffmpeg's overlay filter.
+    
+    Opacity is baked into the alpha channel, so the overlay needs no extra
+    blending options.
     
     Args:
-        clip: Base video clip to add watermark to
-        resolution: Target resolution (width, height)
+        resolution: Video resolution (width, height) the watermark is placed in
+        output_path: Where to write the PNG
         
     Returns:
-        CompositeVideoClip with watermark, or original clip if watermark fails
+        (x, y) overlay position, or None if the watermark could not be rendered
+        or WATERMARK_TEXT is empty
     """
+    if not WATERMARK_TEXT.strip():
+        return None
+    
     try:
-        width, height = resolution
-        clip_duration = getattr(clip, 'duration', None) or CLIP_DURATION_SECONDS
-        
-        # Try multiple fonts for watermark
-        watermark_fonts = ["Arial", "Helvetica", "DejaVu-Sans", "Arial-Bold", "Helvetica-Bold", "DejaVu-Sans-Bold"]
-        txt_clip = None
-        
-        for font_name in watermark_fonts + [None]:
-            try:
-                txt_clip = TextClip(
-                    text=WATERMARK_TEXT,
-                    font_size=WATERMARK_FONT_SIZE,
-                    color=WATERMARK_TEXT_COLOR,
-                    font=font_name,
-                ).with_duration(clip_duration)
-                logger.debug(f"Successfully created watermark text clip with font: {font_name}")
-                break
-            except Exception as e:
-                logger.debug(f"Font {font_name} failed for watermark: {e}, trying next")
+        from PIL import Image
         
-        if txt_clip is None:
-            raise RuntimeError("Failed to create watermark text clip with any method")
+        bitmap = _watermark_bitmap()
+        alpha = np.rint(bitmap[:, :, 3] * WATERMARK_OPACITY).astype(np.uint8)
+        Image.fromarray(np.dstack([bitmap[:, :, :3], alpha])).save(output_path)
         
-        # Calculate position based on text size
-        txt_w, txt_h = txt_clip.size if hasattr(txt_clip, 'size') and txt_clip.size else (0, 0)
-        x_position = width - txt_w - WATERMARK_MARGIN_RIGHT
-        y_position = height - txt_h - WATERMARK_MARGIN_BOTTOM
-        
-        x_position = max(0, x_position)
-        y_position = max(0, y_position)
+        position = _watermark_position((bitmap.shape[1], bitmap.shape[0]), resolution)
+        logger.debug("Rendered watermark image: text=%r, position=%s, opacity=%s", WATERMARK_TEXT, position, WATERMARK_OPACITY)
+        return position
+    except Exception as e:
+        logger.error(f"Failed to render watermark image: {e}", exc_info=True)
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _scan_video_folder(folder: str, mtime_ns: int) -> Tuple[Path, ...]:
+    """
+    Scan a folder for MP4 files; cached per folder and directory mtime.
+    
+    os.scandir reads the directory entries in one pass and answers is_file()
+    from the cached entry type, instead of a stat per Path like glob does.
+    Adding, removing or renaming a file changes the directory mtime, which
+    invalidates the cached listing.
+    """
+    with os.scandir(folder) as entries:
+        return tuple(sorted(Path(e.path) for e in entries if e.name.endswith(".mp4") and e.is_file()))
+
+
+def _list_source_videos(folder: Path) -> List[Path]:
+    """
+    List the MP4 files in a video bank folder, sorted by path.
+    
+    render_video lists the bank while BPM analysis runs and build_visual_track
+    lists it again, so the scan is cached (see _scan_video_folder).
+    
+    Args:
+        folder: Video bank folder
         
-        txt_clip = txt_clip.with_position((x_position, y_position))
+    Returns:
+        Sorted list of MP4 file paths
+    """
+    folder = Path(folder)
+    return list(_scan_video_folder(str(folder), folder.stat().st_mtime_ns))
+
+
+def _existing_clips(checkpoint_dir: Path) -> Dict[str, Path]:
+    """
+    Find the non-empty clip files already written to a checkpoint directory.
+    
+    Args:
+        checkpoint_dir: Directory containing checkpoint files
         
-        if hasattr(txt_clip, "set_opacity"):
-            txt_clip = txt_clip.set_opacity(WATERMARK_OPACITY)
-        elif hasattr(txt_clip, "with_opacity"):
-            txt_clip = txt_clip.with_opacity(WATERMARK_OPACITY)
-        else:
-            logger.debug("Opacity method not available, watermark will be fully opaque")
+    Returns:
+        Dict mapping clip filename to its path
+    """
+    with os.scandir(checkpoint_dir) as entries:
+        return {
+            e.name: Path(e.path)
+            for e in entries
+            if e.name.startswith("clip_") and e.name.endswith(".mp4")
+            and e.is_file() and e.stat().st_size > 0
+        }
+
+
+def _read_concat_list(concat_list_path: Path) -> List[str]:
+    """
+    Read the clip filenames logged in an ffmpeg concat list, in order.
+    
+    Args:
+        concat_list_path: concat_list.txt written by build_visual_track
         
-        base_size = getattr(clip, 'size', None) or resolution
-        result = CompositeVideoClip([clip, txt_clip], size=base_size)
-        result = result.with_duration(clip_duration)
-        logger.debug(f"Created watermark overlay: text='{WATERMARK_TEXT}', position=({x_position}, {y_position}), opacity={WATERMARK_OPACITY}")
-        return result
-    except Exception as e:
-        logger.error(f"Failed to create watermark overlay: {e}", exc_info=True)
-        logger.warning("Returning original clip without watermark overlay due to error")
-        return clip
+    Returns:
+        Clip filenames, or an empty list if the file is missing
+    """
+    if not concat_list_path.is_file():
+        return []
+    names = []
+    for line in concat_list_path.read_text().splitlines():
+        # Lines are "file '<name>'"; a torn final line is ignored
+        if line.startswith("file '") and line.endswith("'"):
+            names.append(line[len("file '"):-1])
+    return names
+
+
+def _read_json(path: Path) -> Any:
+    """Parse a JSON file, with orjson when installed (straight from bytes)."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temporary file and rename it over path."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    if orjson is not None:
+        tmp_path.write_bytes(orjson.dumps(data))
+    else:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+    os.replace(tmp_path, path)
 
 
 def load_blacklist(blacklist_path: Path) -> Set[str]:
@@ -707,8 +1040,7 @@ def load_blacklist(blacklist_path: Path) -> Set[str]:
         return set()
     
     try:
-        with open(blacklist_path, 'r') as f:
-            data = json.load(f)
+        data = _read_json(blacklist_path)
         if isinstance(data, list):
             return set(str(name) for name in data)
         logger.warning(f"Unexpected blacklist format in {blacklist_path}, expected list")
@@ -721,10 +1053,12 @@ def load_blacklist(blacklist_path: Path) -> Set[str]:
 def save_blacklist(blacklist_path: Path, blacklist: Set[str]) -> None:
     """
     Save blacklisted video filenames to a JSON file.
+    
+    Writes a temporary file and renames it over the old one, so an
+    interrupted save never leaves a truncated blacklist behind.
     """
     try:
-        with open(blacklist_path, 'w') as f:
-            json.dump(list(blacklist), f, indent=2)
+        _write_json_atomic(blacklist_path, sorted(blacklist))
     except Exception as e:
         logger.warning(f"Failed to save blacklist: {e}")
 
@@ -736,6 +1070,9 @@ def load_checkpoint(checkpoint_dir: Path) -> Tuple[int, List[Path], Set[str]]:
     Returns file paths as Path objects (not VideoFileClip objects) to avoid
     loading thousands of clips into memory.
     
+    clip_list.json is only rewritten every CHECKPOINT_COMPACT_INTERVAL seconds;
+    clips saved since then are replayed from the append-only concat_list.txt.
+    
     Args:
         checkpoint_dir: Directory containing checkpoint files
         
@@ -749,27 +1086,36 @@ def load_checkpoint(checkpoint_dir: Path) -> Tuple[int, List[Path], Set[str]]:
     if not checkpoint_file.exists():
         return 0, [], set()
     
+    num_clips = None
     try:
-        with open(checkpoint_file, 'r') as f:
-            checkpoint_data = json.load(f)
+        checkpoint_data = _read_json(checkpoint_file)
         start_sec = int(checkpoint_data.get("last_completed_second", 0))
+        num_clips = checkpoint_data.get("num_clips")
     except Exception as e:
         logger.warning(f"Failed to load checkpoint from {checkpoint_file}: {e}")
         start_sec = 0
     
-    clip_paths: List[Path] = []
+    clip_names: List[str] = []
     if clip_list_file.exists():
         try:
-            with open(clip_list_file, 'r') as f:
-                clip_list = json.load(f)
+            clip_list = _read_json(clip_list_file)
             if isinstance(clip_list, list):
-                clip_paths = [checkpoint_dir / str(p) for p in clip_list]
+                clip_names = [str(p) for p in clip_list]
         except Exception as e:
             logger.warning(f"Failed to load clip list from {clip_list_file}: {e}")
     
     blacklist = load_blacklist(blacklist_file)
     
-    return start_sec, clip_paths, blacklist
+    if isinstance(num_clips, int) and num_clips > len(clip_names):
+        logged_names = _read_concat_list(checkpoint_dir / "concat_list.txt")
+        if len(logged_names) < num_clips or logged_names[:len(clip_names)] != clip_names:
+            # Clips already on disk are still reused, so restarting the list
+            # only costs a directory scan
+            logger.warning(f"Clip log in {checkpoint_dir} is behind the checkpoint, rebuilding clip list from second 0")
+            return 0, [], blacklist
+        clip_names = logged_names[:num_clips]
+    
+    return start_sec, [checkpoint_dir / name for name in clip_names], blacklist
 
 
 def save_checkpoint(
@@ -777,15 +1123,24 @@ def save_checkpoint(
     last_completed_second: int,
     clip_paths: List[Path],
     blacklist: Set[str],
+    blacklist_changed: bool = True,
+    write_clip_list: bool = True,
 ) -> None:
     """
     Save checkpoint data to disk.
     
+    Each file is written to a temporary file and renamed into place, so an
+    interrupted save leaves the previous checkpoint intact.
+    
     Args:
         checkpoint_dir: Directory where checkpoint files are stored
         last_completed_second: Last fully processed second index (0-based, inclusive)
         clip_paths: List of Path objects for generated clips
         blacklist: Set of blacklisted filenames
+        blacklist_changed: If False, skip rewriting the blacklist file because
+                           it already matches the set on disk
+        write_clip_list: If False, skip rewriting clip_list.json; the clips
+                         since its last write must be logged in concat_list.txt
     """
     checkpoint_dir.mkdir(parents=True, exist_ok=True)
     
@@ -794,25 +1149,195 @@ def save_checkpoint(
     blacklist_file = checkpoint_dir / "blacklist.json"
     
     try:
+        # The clip list goes first so checkpoint.json never counts clips
+        # that neither the list nor the concat log holds
+        if write_clip_list:
+            _write_json_atomic(clip_list_file, [p.name for p in clip_paths])
+        
         checkpoint_data = {
             "last_completed_second": last_completed_second,
             "num_clips": len(clip_paths),
         }
-        with open(checkpoint_file, 'w') as f:
-            json.dump(checkpoint_data, f, indent=2)
-        
-        clip_list_data = [p.name for p in clip_paths]
-        with open(clip_list_file, 'w') as f:
-            json.dump(clip_list_data, f, indent=2)
+        _write_json_atomic(checkpoint_file, checkpoint_data)
         
-        save_blacklist(blacklist_file, blacklist)
+        if blacklist_changed:
+            save_blacklist(blacklist_file, blacklist)
     except Exception as e:
         logger.warning(f"Failed to save checkpoint: {e}")
 
 
+def _build_schedule(
+    bpm_values: Sequence[float],
+    duration_seconds: int,
+    base_bpm: float,
+    sources: SourceCache,
+    seed: int,
+    speed_min: float = 0.5,
+    speed_max: float = 2.0,
+) -> List[Tuple[Path, float, float, Optional[Tuple[Path, float]]]]:
+    """
+    Pick the source clip, subclip start and playback speed for every second.
+    
+    Each second also gets a fallback source and start, drawn from a second
+    stream so the primary picks are the same with or without it. A source
+    can probe fine and still fail to encode; the fallback keeps such a
+    second from turning into a black frame.
+    
+    Args:
+        bpm_values: BPM value for each second (padded with the last value if short)
+        duration_seconds: Total video duration in seconds
+        base_bpm: Reference BPM for normal playback speed
+        sources: Probed metadata of the readable bank videos
+        seed: Seed for the source and start-time draws
+        speed_min: Minimum speed factor
+        speed_max: Maximum speed factor
+        
+    Returns:
+        List indexed by second of (source path, start time, speed, fallback)
+        tuples, where fallback is a (source path, start time) pair on a
+        different source, or None if the bank has only one source
+    """
+    bpm = np.asarray(bpm_values, dtype=np.float64)[:duration_seconds]
+    if len(bpm) < duration_seconds:
+        # Safety: extend a short BPM list with its last value
+        pad_value = bpm[-1] if len(bpm) else base_bpm
+        bpm = np.concatenate([bpm, np.full(duration_seconds - len(bpm), pad_value)])
+    
+    # Seconds with no usable BPM play at normal speed
+    bpm = np.where(np.isfinite(bpm) & (bpm > 0), bpm, base_bpm)
+    speeds = np.clip(bpm / base_bpm, speed_min, speed_max)
+    
+    # Unreadable sources were already dropped while probing, so a single
+    # draw per second suffices; there is no reject-if-blacklisted retry
+    rng = np.random.default_rng(seed)
+    source_idx = rng.integers(0, len(sources), size=duration_seconds)
+    max_starts = np.maximum(sources.durations - BASE_WINDOW_SECONDS, 0.0)
+    starts = rng.random(duration_seconds) * max_starts[source_idx]
+    
+    paths = sources.paths
+    fallbacks: List[Optional[Tuple[Path, float]]] = [None] * duration_seconds
+    if len(sources) > 1:
+        # Offset by 1..n-1 so the fallback is never the primary source; seed + 1
+        # is already taken by the GIPHY picks in build_visual_track
+        fallback_rng = np.random.default_rng(seed + 2)
+        fallback_idx = (source_idx + fallback_rng.integers(1, len(sources), size=duration_seconds)) % len(sources)
+        fallback_starts = fallback_rng.random(duration_seconds) * max_starts[fallback_idx]
+        fallbacks = [(paths[i], start) for i, start in zip(fallback_idx.tolist(), fallback_starts.tolist())]
+    
+    return [
+        (paths[i], start, speed, fallback)
+        for i, start, speed, fallback in zip(source_idx.tolist(), starts.tolist(), speeds.tolist(), fallbacks)
+    ]
+
+
+def _render_one_second(
+    sec: int,
+    duration_seconds: int,
+    source: Path,
+    source_size: Tuple[int, int],
+    start_time: float,
+    speed: float,
+    gif_url: str | None,
+    gif_query: str,
+    target_resolution: Tuple[int, int],
+    checkpoint_clip_path: Path,
+    giphy_cache_dir: Path | None,
+    encoder_threads: int,
+    fallback: Optional[Tuple[Path, Tuple[int, int], float]] = None,
+) -> Tuple[int, Optional[Path], List[str], int, List[Tuple[int, str]]]:
+    """
+    Render and write the 1-second clip for one second of the visual track.
+    
+    Runs in a worker process, so it only takes picklable arguments and
+    reports blacklist additions and warnings back instead of mutating shared
+    state or logging them there (a worker's log records would not reach the
+    handlers of the parent, e.g. an API job's log stream). All random choices
+    are made beforehand by _build_schedule.
+    
+    Args:
+        sec: Second index being rendered
+        duration_seconds: Total video duration in seconds (for logging)
+        source: Bank video to cut the subclip from
+        source_size: Frame size (width, height) of the bank video
+        start_time: Subclip start within the source, in seconds
+        speed: BPM-derived playback speed factor for this second
+        gif_url: GIPHY URL to use as the base clip instead, if any
+        gif_query: Query the GIPHY URL came from (for logging)
+        target_resolution: Output resolution (width, height)
+        checkpoint_clip_path: Where to write the clip
+        giphy_cache_dir: Directory for downloaded GIPHY files
+        encoder_threads: ffmpeg/x264 threads for this clip's encode
+        fallback: (source, source size, start time) to cut from instead if
+                  `source` fails to encode, before resorting to a black frame
+        
+    Returns:
+        Tuple of (sec, written clip path or None, newly blacklisted filenames,
+        number of black-frame fallbacks, (log level, message) pairs for the
+        parent to log)
+    """
+    failed_names: List[str] = []
+    messages: List[Tuple[int, str]] = []
+
+    logger.debug("Building clip for second %d/%d", sec, duration_seconds)
+
+    if gif_url is not None:
+        # Use GIPHY GIF as base clip (full screen, same size as dance visuals)
+        try:
+            logger.debug("Using GIPHY GIF for query %r at second %d", gif_query, sec)
+
+            # Download and cache the GIF
+            cached_path = _download_giphy_gif(gif_url, giphy_cache_dir)
+
+            if cached_path:
+                # Loop short GIFs so the clip always fills the full second
+                _encode_clip(
+                    ["-stream_loop", "-1", "-i", str(cached_path)],
+                    checkpoint_clip_path,
+                    target_resolution,
+                    speed,
+                    encoder_threads,
+                )
+                logger.debug("Successfully rendered GIPHY GIF for %r at second %d", gif_query, sec)
+                return sec, checkpoint_clip_path, failed_names, 0, messages
+            messages.append((logging.WARNING, f"Failed to cache GIPHY file for '{gif_query}' at second {sec}, falling back to bank"))
+        except Exception as e:
+            messages.append((logging.WARNING, f"Failed to render GIPHY GIF at second {sec}: {e}, falling back to bank"))
+
+    # If not using GIPHY (or GIPHY failed), use dance GIF from bank; seeking
+    # before -i jumps straight to the window instead of decoding from the start.
+    # Since we transcode, ffmpeg's default -accurate_seek then decodes from the
+    # preceding keyframe and drops frames up to start_time, so the cut is
+    # frame-exact without the old two -ss idiom
+    candidates = [(source, source_size, start_time)]
+    if fallback is not None:
+        candidates.append(fallback)
+    for candidate, candidate_size, candidate_start in candidates:
+        try:
+            _encode_clip(
+                ["-ss", f"{candidate_start:.3f}", "-t", f"{BASE_WINDOW_SECONDS:.3f}", "-i", str(candidate)],
+                checkpoint_clip_path,
+                target_resolution,
+                speed,
+                encoder_threads,
+                source_size=candidate_size,
+            )
+            return sec, checkpoint_clip_path, failed_names, 0, messages
+        except Exception as e:
+            messages.append((logging.WARNING, f"Error processing video {candidate}: {e}"))
+            failed_names.append(candidate.name)
+    messages.append((logging.WARNING, f"No bank video could be encoded for second {sec}, using black frame"))
+
+    try:
+        _encode_black_clip(checkpoint_clip_path, target_resolution, encoder_threads)
+        return sec, checkpoint_clip_path, failed_names, 1, messages
+    except Exception as e:
+        messages.append((logging.ERROR, f"Failed to create fallback black frame for second {sec}: {e}"))
+        return sec, None, failed_names, 1, messages
+
+
 def build_visual_track(
     video_folder: str,
-    bpm_values: List[float],
+    bpm_values: Sequence[float],
     duration_seconds: int,
     target_resolution: Tuple[int, int],
     base_bpm: float,
@@ -822,6 +1347,7 @@ def build_visual_track(
     lyrics_mapping: Dict[int, str] | None = None,
     karaoke_mapping: Dict[int, str] | None = None,
     giphy_segment_plan: Dict[int, Dict[str, Any]] | None = None,
+    source_info: SourceCache | None = None,
 ) -> List[Path]:
     """
     Build visual track by generating 1-second clips and writing them to disk.
@@ -833,7 +1359,7 @@ def build_visual_track(
     
     Args:
         video_folder: Folder containing MP4 clips to sample from
-        bpm_values: List of BPM values for each second
+        bpm_values: BPM value for each second (list or numpy array)
         duration_seconds: Total video duration in seconds
         target_resolution: Output resolution (width, height)
         base_bpm: Reference BPM for normal playback speed
@@ -841,10 +1367,16 @@ def build_visual_track(
         speed_max: Maximum speed factor (for very high BPM)
         checkpoint_dir: Directory to store checkpoint files (if None, use CHECKPOINTS_DIR)
         lyrics_mapping: Optional mapping second -> phrase-ending word for overlay
-        karaoke_mapping: Optional mapping second -> text line for karaoke overlay
+        karaoke_mapping: Optional mapping second -> text line for karaoke overlay.
+                         Lyric overlays are currently disabled, so both mappings
+                         are accepted but not drawn; re-enabling them should
+                         rasterize each unique text once via _render_text_bitmap
+                         before clips are dispatched to the workers
         giphy_segment_plan: Optional mapping for GIPHY overlays per segment:
                             {segment_id: {"gif_query": ..., "gif_urls": [...], "start": ..., "end": ...}}
                             For future GIPHY overlay compositing. Currently threaded through but not used.
+        source_info: Optional SourceCache from _probe_sources, e.g. probed while
+                     BPM analysis ran; sources missing from it are probed here
         
     Returns:
         List of Path objects pointing to generated 1-second clip files in order
@@ -867,12 +1399,30 @@ def build_visual_track(
     blacklist.update(existing_blacklist)
 
     # Filter out blacklisted files
-    all_video_paths = sorted([p for p in folder.glob("*.mp4") if p.is_file()])
+    all_video_paths = _list_source_videos(folder)
     video_paths = [p for p in all_video_paths if p.name not in blacklist]
 
     if not video_paths:
         raise FileNotFoundError(f"No usable MP4 files found in: {video_folder} (all blacklisted?)")
 
+    # Probe each source once here rather than opening it for every second
+    sources = source_info.select(video_paths) if source_info is not None else SourceCache.from_rows([])
+    probed = set(sources.paths)
+    unprobed = [p for p in video_paths if p not in probed]
+    if unprobed:
+        # Keep the bank's sorted order so seeded schedules stay reproducible
+        sources = sources.merged(_probe_sources(unprobed)).select(video_paths)
+    readable = set(sources.paths)
+    unreadable = [p.name for p in video_paths if p not in readable]
+    # Only rewrite blacklist.json at a checkpoint if the set grew since the last save
+    blacklist_dirty = bool(unreadable)
+    if unreadable:
+        blacklist.update(unreadable)
+        logger.info(f"Blacklisted {len(unreadable)} unreadable source videos")
+
+    if not sources:
+        raise FileNotFoundError(f"No usable MP4 files found in: {video_folder} (all unreadable)")
+
     if start_sec > 0:
         logger.info(f"Resuming from second {start_sec}, {len(saved_clip_paths)} clips already saved")
 
@@ -893,7 +1443,7 @@ def build_visual_track(
             gif_urls = segment_data.get("gif_urls", [])
             
             if not gif_urls:
-                logger.debug(f"Segment {segment_id} has no GIF URLs, skipping")
+                logger.debug("Segment %s has no GIF URLs, skipping", segment_id)
                 continue
             
             # Assign this segment to all integer seconds it covers
@@ -910,174 +1460,136 @@ def build_visual_track(
     checkpoint_interval = CHECKPOINT_INTERVAL
     skipped_count = 0
 
-    # Safety: ensure BPM list is at least duration_seconds long
-    if len(bpm_values) < duration_seconds:
-        last_bpm = bpm_values[-1] if bpm_values else base_bpm
-        bpm_values = bpm_values + [last_bpm] * (duration_seconds - len(bpm_values))
-
+    # Decide every second's source, start and speed up front. The schedule is
+    # drawn from one seed taken from the global RNG, so a render seeded via
+    # random.seed() picks the same clips however workers are scheduled (and
+    # a resumed render keeps the choices it would have made)
+    base_seed = random.getrandbits(64)
+    schedule = _build_schedule(
+        bpm_values, duration_seconds, base_bpm, sources, base_seed, speed_min, speed_max,
+    )
+    gif_picks = np.random.default_rng(base_seed + 1).random(duration_seconds).tolist()
+    # Looked up per second so clips from sources already at the target size
+    # can skip the letterbox filter
+    source_sizes = dict(zip(sources.paths, zip(sources.widths.tolist(), sources.heights.tolist())))
+
+    # Split the cores between workers so N concurrent x264 encoders don't each
+    # autodetect every core; past ~4 threads a 1-second clip encodes no faster
+    cpu_count = os.cpu_count() or 1
+    workers = VISUAL_BUILD_WORKERS or max(1, cpu_count // VISUAL_ENCODER_THREADS)
+    encoder_threads = min(_MAX_ENCODER_THREADS, max(1, cpu_count // workers))
+
+    # Clips are only renamed into place once fully encoded, so any clip file
+    # past the checkpoint (e.g. finished by a worker after the last save) can
+    # be reused as-is
+    existing_clips = _existing_clips(checkpoint_dir)
+
+    finished: Dict[int, Optional[Path]] = {}
+    tasks = []
     for sec in range(start_sec, duration_seconds):
-        logger.debug(f"Building clip for second {sec}/{duration_seconds}")
-
-        # Load BPM for this second
-        if sec < len(bpm_values):
-            local_bpm = bpm_values[sec]
-        else:
-            local_bpm = base_bpm
-        speed = float(np.clip(local_bpm / base_bpm, speed_min, speed_max))
-
-        checkpoint_clip_path = checkpoint_dir / f"clip_{sec:06d}.mp4"
-
-        # Check if we should use a GIPHY GIF as the base clip for this second
-        use_giphy = False
-        gif_urls: List[str] = []
+        clip_name = f"clip_{sec:06d}.mp4"
+        existing_clip = existing_clips.get(clip_name)
+        if existing_clip is not None:
+            finished[sec] = existing_clip
+            continue
+        source, start_time, speed, fallback = schedule[sec]
+        gif_url: str | None = None
         gif_query = "unknown"
-        
-        if second_to_giphy_segment and sec in second_to_giphy_segment:
-            segment_data = second_to_giphy_segment[sec]
-            gif_urls = segment_data.get("gif_urls", [])
+        segment_data = second_to_giphy_segment.get(sec)
+        if segment_data is not None and giphy_cache_dir is not None:
+            gif_urls = segment_data["gif_urls"]
+            gif_url = gif_urls[int(gif_picks[sec] * len(gif_urls))]
             gif_query = segment_data.get("gif_query", "unknown")
-            use_giphy = len(gif_urls) > 0 and giphy_cache_dir is not None
-        
-        if use_giphy:
-            # Use GIPHY GIF as base clip (full screen, same size as dance visuals)
-            try:
-                selected_gif_url = random.choice(gif_urls)
-                logger.debug(f"Using GIPHY GIF for query '{gif_query}' at second {sec}")
-                
-                # Download and cache the GIF
-                cached_path = _download_giphy_gif(selected_gif_url, giphy_cache_dir)
-                
-                if cached_path:
-                    # Load GIPHY GIF as full-screen base clip
-                    one_sec = _load_giphy_as_base_clip(str(cached_path), target_resolution, speed)
-                    if one_sec is None:
-                        logger.warning(f"Failed to load GIPHY GIF for '{gif_query}' at second {sec}, falling back to bank")
-                        use_giphy = False  # Fall through to bank logic
-                    else:
-                        logger.debug(f"Successfully loaded GIPHY GIF for '{gif_query}' at second {sec}")
-                else:
-                    logger.warning(f"Failed to cache GIPHY file for '{gif_query}' at second {sec}, falling back to bank")
-                    use_giphy = False  # Fall through to bank logic
-            except Exception as e:
-                logger.warning(f"Failed to load GIPHY GIF at second {sec}: {e}", exc_info=True)
-                use_giphy = False  # Fall through to bank logic
-        
-        # If not using GIPHY (or GIPHY failed), use dance GIF from bank
-        if not use_giphy:
-            # Try to load a random video from bank with error handling
-            video_clip = None
-            video_path: Path | None = None
-            max_tries = 5
-
-            for attempt in range(max_tries):
-                candidate = random.choice(video_paths)
-                if candidate.name in blacklist:
-                    continue
-                video_path = candidate
-                try:
-                    video_clip = VideoFileClip(str(video_path), audio=False)
-                    dur = video_clip.duration
-                    if dur is None or dur <= 0:
-                        raise ValueError(f"Invalid duration: {dur}")
-                    break
-                except Exception as e:
-                    logger.warning(f"Failed to load video {candidate}: {e}")
-                    blacklist.add(candidate.name)
-                    if video_clip is not None:
-                        video_clip.close()
-                    video_clip = None
-
-            if video_clip is None:
-                logger.error("Failed to load any video clip after multiple attempts; using black frame")
-                one_sec = _create_black_frame(target_resolution, CLIP_DURATION_SECONDS)
-                skipped_count += 1
-            else:
-                try:
-                    duration = video_clip.duration or CLIP_DURATION_SECONDS
-                    if duration <= 0:
-                        raise ValueError(f"Invalid clip duration: {duration}")
-
-                    # Extract a random window and speed it via BPM
-                    base_window = BASE_WINDOW_SECONDS
-                    max_start = max(duration - base_window, 0)
-                    start_time = random.uniform(0, max_start)
-                    end_time = start_time + base_window
-
-                    sub = _subclip(video_clip, start_time, min(end_time, duration))
-
-                    # Apply speed change
-                    sub = _speedx(sub, speed)
-
-                    # Resize with letterbox to target res
-                    boxed = _resize_letterbox(sub, target_resolution)
-
-                    # Set duration to exactly 1 second
-                    one_sec = _set_duration(boxed, CLIP_DURATION_SECONDS)
-                except Exception as e:
-                    logger.warning(f"Error processing video {video_path}: {e}")
-                    blacklist.add(video_path.name if video_path else "unknown")
-                    if video_clip is not None:
-                        video_clip.close()
-                    one_sec = _create_black_frame(target_resolution, CLIP_DURATION_SECONDS)
-                    skipped_count += 1
-                # NOTE: Do NOT close video_clip here - one_sec maintains a reference chain
-                # (one_sec → boxed → sub → video_clip) and needs it open until write_videofile completes.
-                # The clip will be cleaned up when one_sec is closed after writing.
-
-        # Note: Lyric overlays have been removed - GIPHY GIFs are now used as base clips (not overlays)
-
-        # Write 1-second clip to disk
-        # Safety check: ensure one_sec is not None and is valid
-        if one_sec is None:
-            logger.error(f"one_sec is None for second {sec}, creating black frame fallback")
-            one_sec = _create_black_frame(target_resolution, CLIP_DURATION_SECONDS)
-            skipped_count += 1
-        
-        # Additional validation: ensure clip has required attributes
-        if not hasattr(one_sec, 'duration') or getattr(one_sec, 'duration', None) is None:
-            logger.warning(f"Clip for second {sec} has invalid duration, recreating black frame")
-            one_sec = _create_black_frame(target_resolution, CLIP_DURATION_SECONDS)
-            skipped_count += 1
-        
-        try:
-            # Ensure clip is valid before writing
-            if one_sec is None:
-                raise ValueError("one_sec is None after all checks")
-            
-            one_sec.write_videofile(  # type: ignore[attr-defined]
-                str(checkpoint_clip_path),
-                codec="libx264",
-                fps=DEFAULT_FPS,
-                audio=False,
+        tasks.append((
+            sec,
+            duration_seconds,
+            source,
+            source_sizes[source],
+            start_time,
+            speed,
+            gif_url,
+            gif_query,
+            target_resolution,
+            checkpoint_dir / clip_name,
+            giphy_cache_dir,
+            encoder_threads,
+            (fallback[0], source_sizes[fallback[0]], fallback[1]) if fallback is not None else None,
+        ))
+
+    if finished:
+        logger.info(f"Reusing {len(finished)} clips already on disk")
+
+    executor: ProcessPoolExecutor | None = None
+    if workers > 1 and len(tasks) > 1:
+        logger.info(f"Rendering {len(tasks)} clips with {workers} worker processes ({encoder_threads} encoder threads each)")
+        # Spawn rather than fork: renders may run on a thread of a
+        # multi-threaded server process, which is unsafe to fork
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        futures = [executor.submit(_render_one_second, *task) for task in tasks]
+        results = (future.result() for future in as_completed(futures))
+    else:
+        results = (_render_one_second(*task) for task in tasks)
+
+    # Seconds can finish out of order; only the contiguous prefix is appended
+    # to clip_paths and checkpointed, so a resume never skips a missing clip
+    next_sec = start_sec
+
+    # Keep the ffmpeg concat list in step with clip_paths so render_video
+    # doesn't need a second pass over every path. The concat demuxer resolves
+    # bare filenames against the list's own directory, where the clips live
+    concat_file = open(checkpoint_dir / "concat_list.txt", "w")
+    concat_file.write("".join(f"file '{p.name}'\n" for p in clip_paths))
+    concat_file.flush()
+
+    def advance() -> None:
+        nonlocal next_sec, blacklist_dirty
+        checkpoint_due = False
+        compact_due = False
+        while next_sec in finished:
+            done_path = finished.pop(next_sec)
+            if done_path is not None:
+                clip_paths.append(done_path)
+                concat_file.write(f"file '{done_path.name}'\n")
+            next_sec += 1
+            if next_sec % checkpoint_interval == 0 or next_sec == duration_seconds:
+                checkpoint_due = True
+            if next_sec % CHECKPOINT_COMPACT_INTERVAL == 0 or next_sec == duration_seconds:
+                compact_due = True
+
+        # Save checkpoint periodically; between compactions the concat list
+        # is the log of saved clips, so only its new lines hit the disk
+        if checkpoint_due:
+            concat_file.flush()
+            save_checkpoint(
+                checkpoint_dir,
+                next_sec,
+                clip_paths,
+                blacklist,
+                blacklist_changed=blacklist_dirty,
+                write_clip_list=compact_due,
             )
-            clip_paths.append(checkpoint_clip_path)
-        except Exception as e:
-            logger.error(f"Failed to write clip for second {sec}: {e}", exc_info=True)
-            # Try to create and write a black frame as absolute fallback
-            try:
-                fallback_clip = _create_black_frame(target_resolution, CLIP_DURATION_SECONDS)
-                fallback_clip.write_videofile(
-                    str(checkpoint_clip_path),
-                    codec="libx264",
-                    fps=DEFAULT_FPS,
-                    audio=False,
-                )
-                clip_paths.append(checkpoint_clip_path)
-                logger.info(f"Created black frame fallback for second {sec}")
-            except Exception as fallback_error:
-                logger.error(f"Failed to create fallback black frame for second {sec}: {fallback_error}")
-                blacklist.add(video_path.name if video_path else f"unknown_sec_{sec}")
-                skipped_count += 1
-        finally:
-            try:
-                one_sec.close()
-            except Exception:
-                pass
+            blacklist_dirty = False
+            logger.info(f"Saved progress at second {next_sec}/{duration_seconds}")
 
-        # Save checkpoint periodically
-        if (sec + 1) % checkpoint_interval == 0 or sec == duration_seconds - 1:
-            save_checkpoint(checkpoint_dir, sec + 1, clip_paths, blacklist)
-            logger.info(f"Saved progress at second {sec + 1}/{duration_seconds}")
+    # Route console log records through tqdm.write while the bar is live so
+    # checkpoint messages don't tear the bar and force a redraw. The handlers
+    # live on the root logger (this module's records propagate there).
+    try:
+        advance()
+        with logging_redirect_tqdm():
+            for sec, clip_path, failed_names, skipped, messages in tqdm(results, total=len(tasks), desc="Clips", ncols=80):
+                for level, message in messages:
+                    logger.log(level, message)
+                if not blacklist.issuperset(failed_names):
+                    blacklist.update(failed_names)
+                    blacklist_dirty = True
+                skipped_count += skipped
+                finished[sec] = clip_path
+                advance()
+    finally:
+        concat_file.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     if skipped_count > 0:
         logger.info(f"Skipped {skipped_count} problematic clips (used black frames)")
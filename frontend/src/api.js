@@ -40,7 +40,9 @@ export function connectLogStream(jobId, onLog, onStatus) {
     try {
       const data = JSON.parse(event.data);
       
-      if (data.type === 'log') {
+      if (data.type === 'logs') {
+        data.messages.forEach((message) => onLog(message));
+      } else if (data.type === 'log') {
         onLog(data.message);
       } else if (data.type === 'status') {
         onStatus(data.status, data.message);
@@ -2,6 +2,7 @@
 Smoke tests for audio analysis module.
 Verifies that functions can be called without crashing.
 """
+import numpy as np
 import pytest
 from pathlib import Path
 
@@ -30,6 +31,7 @@ def test_bpm_timeline_from_segments():
     ]
     timeline = bpm_timeline_from_segments(segments, duration_seconds=10)
     assert len(timeline) == 10
+    assert timeline.dtype == np.float32
     assert timeline[0] == 120.0
     assert timeline[5] == 140.0
 
@@ -52,6 +54,21 @@ def test_analyze_global_bpm_missing_file():
         analyze_global_bpm("nonexistent_file.wav", duration_seconds=10)
 
 
+def test_analyze_global_bpm_weighted_median(monkeypatch):
+    """Test that analyze_global_bpm returns the length-weighted median BPM."""
+    import audiogiphy.audio_analysis as audio_analysis
+
+    segments = [
+        BpmSegment(start=0.0, end=30.0, bpm=90.0),
+        BpmSegment(start=30.0, end=50.0, bpm=128.0),
+        BpmSegment(start=50.0, end=70.0, bpm=140.0),
+    ]
+    monkeypatch.setattr(audio_analysis, "analyze_bpm_segments", lambda *args, **kwargs: segments)
+
+    # Longest segment is 90 BPM, but it holds less than half of the total weight
+    assert audio_analysis.analyze_global_bpm("unused.wav", duration_seconds=70) == 128.0
+
+
 @pytest.mark.skipif(
     not Path("clean mashup mix 88 to 134.wav").exists(),
     reason="Sample audio file not found"
@@ -62,5 +79,6 @@ def test_analyze_bpm_per_second_with_sample():
     duration = 10  # Analyze first 10 seconds
     bpm_values = analyze_bpm_per_second(audio_path, duration)
     assert len(bpm_values) == duration
-    assert all(isinstance(bpm, float) and bpm > 0 for bpm in bpm_values)
+    assert isinstance(bpm_values, np.ndarray)
+    assert np.all(bpm_values > 0)
 
@@ -34,3 +34,12 @@ def test_config_values_exist():
     assert isinstance(config.CHECKPOINTS_DIR, str)
     assert len(config.CHECKPOINTS_DIR) > 0
 
+
+def test_cfg_matches_module_constants():
+    """Verify CFG exposes every constant read-only."""
+    assert config.CFG.DEFAULT_FPS == config.DEFAULT_FPS
+    assert config.CFG.DEFAULT_RESOLUTION == config.DEFAULT_RESOLUTION
+    assert config.CFG.WHISPER_MODEL_SIZE == config.WHISPER_MODEL_SIZE
+    
+    with pytest.raises(AttributeError):
+        config.CFG.DEFAULT_FPS = 60
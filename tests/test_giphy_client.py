@@ -0,0 +1,63 @@
+"""
+Smoke tests for GIPHY client module.
+"""
+import threading
+
+import pytest
+
+from audiogiphy.giphy_client import GiphyClient, requests
+
+
+class _StubResponse:
+    def __init__(self, query):
+        self.query = query
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return {"data": [{"images": {"original": {"mp4": f"https://example.com/{self.query}.mp4"}}}]}
+
+
+class _StubSession:
+    """Records each GET instead of calling the GIPHY API."""
+    
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append((params["q"], threading.current_thread().name))
+        return _StubResponse(params["q"])
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.skipif(requests is None, reason="requests not installed")
+def test_search_gifs_batch_uses_cache_and_pool(tmp_path):
+    """Test that cached queries skip HTTP, misses run on the pool, and order is kept."""
+    with GiphyClient(api_key="test-key", cache_path=tmp_path / "giphy_cache.sqlite") as client:
+        session = _StubSession()
+        client.session.close()
+        client.session = session
+        # One query cached in memory, one only on disk
+        client._cache[client._cache_key("cats", 25, "g", "en")] = ["https://example.com/cached-cats.mp4"]
+        client._disk_cache_put(client._cache_key("dogs", 25, "g", "en"), ["https://example.com/cached-dogs.mp4"])
+        
+        queries = ["Birds", "cats", "fish", "dogs", " CATS "]
+        results = client.search_gifs_batch(queries)
+        
+        assert list(results) == queries
+        assert results["cats"] == results[" CATS "] == ["https://example.com/cached-cats.mp4"]
+        assert results["dogs"] == ["https://example.com/cached-dogs.mp4"]
+        assert results["Birds"] == ["https://example.com/Birds.mp4"]
+        assert results["fish"] == ["https://example.com/fish.mp4"]
+        
+        assert sorted(query for query, _ in session.calls) == ["Birds", "fish"]
+        assert all(thread.startswith("giphy") for _, thread in session.calls)
+        
+        # Everything is cached now, so a repeat batch makes no requests
+        assert client.search_gifs_batch(queries) == results
+        assert len(session.calls) == 2
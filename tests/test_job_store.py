@@ -0,0 +1,90 @@
+"""
+Smoke tests for job store module.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from audiogiphy.job_store import InMemoryJobStore, create_job_store
+
+
+def test_in_memory_job_lifecycle():
+    """Test creating, updating and reading a job."""
+    store = InMemoryJobStore()
+    store.create_job("job1", {"audio": "song.wav"})
+    
+    job = store.get_job("job1")
+    assert job["status"] == "queued"
+    assert job["params"] == {"audio": "song.wav"}
+    assert store.count_jobs("queued") == 1
+    
+    store.update_job("job1", "complete", "done")
+    job = store.get_job("job1")
+    assert job["status"] == "complete"
+    assert job["message"] == "done"
+    assert store.count_jobs("queued") == 0
+    assert store.get_job("missing") is None
+
+
+def test_in_memory_create_job_queue_limit():
+    """Test that jobs are not created once the queue limit is reached."""
+    store = InMemoryJobStore()
+    assert store.create_job("job1", {}, max_queued=1)
+    assert not store.create_job("job2", {}, max_queued=1)
+    assert store.get_job("job2") is None
+    
+    store.update_job("job1", "running")
+    assert store.create_job("job2", {}, max_queued=1)
+
+
+def test_in_memory_logs_since_offset():
+    """Test that log offsets survive lines being dropped from the bounded log."""
+    store = InMemoryJobStore(max_logs=3)
+    store.create_job("job1", {})
+    for i in range(2):
+        store.append_log("job1", f"line {i}".encode())
+    
+    messages, offset = store.get_logs_since("job1", 0)
+    assert messages == [b"line 0", b"line 1"]
+    assert offset == 2
+    
+    for i in range(2, 6):
+        store.append_log("job1", f"line {i}".encode())
+    
+    # Only the 3 most recent lines are kept
+    messages, offset = store.get_logs_since("job1", offset)
+    assert messages == [b"line 3", b"line 4", b"line 5"]
+    assert offset == 6
+
+
+def test_in_memory_wait_for_update():
+    """Test that wait_for_update times out when idle and returns on new logs."""
+    store = InMemoryJobStore()
+    store.create_job("job1", {})
+    
+    assert store.wait_for_update("job1", 0, timeout=0.01) is False
+    store.append_log("job1", b"hello")
+    assert store.wait_for_update("job1", 0, timeout=0.01) is True
+
+
+def test_create_job_store_unknown_backend(monkeypatch):
+    """Test that an unknown backend name raises ValueError."""
+    monkeypatch.setenv("AUDIOGIPHY_JOB_STORE", "nope")
+    with pytest.raises(ValueError):
+        create_job_store()
+
+
+def test_in_memory_wait_for_update_async():
+    """Test that async waiters time out when idle and wake up on new logs."""
+    store = InMemoryJobStore()
+    store.create_job("job1", {})
+    
+    async def wait_then_log():
+        assert await store.wait_for_update_async("job1", 0, timeout=0.01) is False
+        waiter = asyncio.create_task(store.wait_for_update_async("job1", 0, timeout=5.0))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=store.append_log, args=("job1", b"hello")).start()
+        return await waiter
+    
+    assert asyncio.run(wait_then_log()) is True
@@ -7,8 +7,10 @@ from pathlib import Path
 
 from audiogiphy.lyrics_analysis import (
     detect_lyrics,
+    detect_lyrics_batch,
     LyricsResult,
     LyricWord,
+    clear_model_cache,
 )
 
 
@@ -51,6 +53,33 @@ def test_detect_lyrics_missing_file():
         detect_lyrics("nonexistent_file.wav")
 
 
+def test_detect_lyrics_batch_missing_file():
+    """Test that detect_lyrics_batch raises FileNotFoundError for a missing file."""
+    from audiogiphy.lyrics_analysis import WHISPER_AVAILABLE
+    if not WHISPER_AVAILABLE:
+        pytest.skip("Whisper not installed")
+    
+    with pytest.raises(FileNotFoundError):
+        detect_lyrics_batch(["nonexistent_a.wav", "nonexistent_b.wav"])
+
+
+def test_detect_lyrics_batch_without_whisper(tmp_path, monkeypatch):
+    """Test that detect_lyrics_batch raises RuntimeError when no Whisper backend is installed."""
+    from audiogiphy import lyrics_analysis
+    
+    monkeypatch.setattr(lyrics_analysis, "OPENAI_WHISPER_AVAILABLE", False)
+    monkeypatch.setattr(lyrics_analysis, "FASTER_WHISPER_AVAILABLE", False)
+    monkeypatch.setattr(lyrics_analysis, "WHISPER_AVAILABLE", False)
+    paths = []
+    for name in ("a.wav", "b.wav"):
+        path = tmp_path / name
+        path.write_bytes(b"")
+        paths.append(str(path))
+    
+    with pytest.raises(RuntimeError, match="Whisper is not installed"):
+        detect_lyrics_batch(paths)
+
+
 @pytest.mark.skipif(
     not Path("clean mashup mix 88 to 134.wav").exists(),
     reason="Sample audio file not found"
@@ -80,3 +109,12 @@ def test_detect_lyrics_with_sample():
         assert word.start >= 0
         assert word.end >= word.start
 
+
+
+def test_clear_model_cache():
+    """Test that clear_model_cache empties the model cache."""
+    from audiogiphy import lyrics_analysis
+    
+    lyrics_analysis._MODEL_CACHE[("openai", "tiny")] = object()
+    clear_model_cache()
+    assert lyrics_analysis._MODEL_CACHE == {}
@@ -2,10 +2,20 @@
 Smoke tests for visual builder module.
 Verifies that functions can be called without crashing.
 """
+import json
+import logging
+from concurrent.futures import Future
+
 import pytest
 from pathlib import Path
 
-from audiogiphy.visual_builder import build_visual_track, _add_watermark
+from audiogiphy import visual_builder
+from audiogiphy.visual_builder import (
+    SourceCache,
+    build_visual_track,
+    load_checkpoint,
+    _render_watermark_image,
+)
 
 
 def test_build_visual_track_missing_folder():
@@ -68,24 +78,223 @@ def test_build_visual_track_with_bank():
         assert all(p.exists() for p in clip_paths)
 
 
-def test_add_watermark():
-    """Test that watermark helper can be called without crashing."""
-    from moviepy import VideoFileClip, ColorClip  # type: ignore
+def test_render_watermark_image():
+    """Test that the watermark PNG for the ffmpeg overlay is rendered inside the frame."""
+    from PIL import Image
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        png_path = Path(tmpdir) / "watermark.png"
+        position = _render_watermark_image((1080, 1920), png_path)
+        if position is None:
+            pytest.skip("Watermark text could not be rendered (no usable font)")
+        
+        with Image.open(png_path) as image:
+            assert image.mode == "RGBA"
+            x, y = position
+            assert 0 <= x and x + image.width <= 1080
+            assert 0 <= y and y + image.height <= 1920
+
+
+def _fake_bank(tmp_path):
+    """Create a bank of placeholder MP4s and a SourceCache so nothing is probed."""
+    bank = tmp_path / "bank"
+    bank.mkdir()
+    rows = []
+    for name in ("a.mp4", "b.mp4"):
+        path = bank / name
+        path.write_bytes(b"")
+        rows.append((path, (10.0, 1080, 1920)))
+    return bank, SourceCache.from_rows(rows)
+
+
+def _fake_render(rendered, failed=()):
+    """Stand-in for _render_one_second that writes a placeholder clip file."""
+    def render(sec, *args):
+        rendered.append(sec)
+        if sec in failed:
+            return sec, None, [], 1, [(logging.WARNING, f"second {sec} failed")]
+        clip_path = args[8]
+        clip_path.write_bytes(b"clip")
+        return sec, clip_path, [], 0, []
+    return render
+
+
+class _InlineExecutor:
+    """ProcessPoolExecutor stand-in that runs tasks immediately in this process."""
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+    
+    def shutdown(self, cancel_futures=False):
+        pass
+
+
+def _build(bank, sources, checkpoint_dir, duration):
+    return build_visual_track(
+        video_folder=str(bank),
+        bpm_values=[120.0] * duration,
+        duration_seconds=duration,
+        target_resolution=(1080, 1920),
+        base_bpm=120.0,
+        checkpoint_dir=checkpoint_dir,
+        source_info=sources,
+    )
+
+
+def test_build_visual_track_out_of_order_completion(tmp_path, monkeypatch):
+    """Test that only the contiguous prefix of finished seconds is checkpointed."""
+    bank, sources = _fake_bank(tmp_path)
+    checkpoint_dir = tmp_path / "checkpoints"
+    completion_order = [1, 0, 4, 2, 3, 5]
+    
+    rendered = []
+    saves = []
+    save_checkpoint = visual_builder.save_checkpoint
+    
+    def record_save(checkpoint_dir, last_completed_second, clip_paths, *args, **kwargs):
+        saves.append((last_completed_second, [p.name for p in clip_paths]))
+        save_checkpoint(checkpoint_dir, last_completed_second, clip_paths, *args, **kwargs)
+    
+    monkeypatch.setattr(visual_builder, "VISUAL_BUILD_WORKERS", 2)
+    monkeypatch.setattr(visual_builder, "CHECKPOINT_INTERVAL", 2)
+    monkeypatch.setattr(visual_builder, "ProcessPoolExecutor", _InlineExecutor)
+    monkeypatch.setattr(visual_builder, "as_completed", lambda futures: [futures[i] for i in completion_order])
+    monkeypatch.setattr(visual_builder, "_render_one_second", _fake_render(rendered, failed={2}))
+    monkeypatch.setattr(visual_builder, "save_checkpoint", record_save)
+    
+    clip_paths = _build(bank, sources, checkpoint_dir, 6)
+    
+    expected = [f"clip_{sec:06d}.mp4" for sec in (0, 1, 3, 4, 5)]
+    assert sorted(rendered) == list(range(6))
+    assert [p.name for p in clip_paths] == expected
+    # Second 4 finishes early but is only saved once 2 and 3 are done
+    assert saves == [
+        (2, expected[:2]),
+        (5, expected[:4]),
+        (6, expected),
+    ]
+    assert (checkpoint_dir / "concat_list.txt").read_text() == "".join(f"file '{name}'\n" for name in expected)
+
+
+def test_build_visual_track_reuses_clips_on_disk(tmp_path, monkeypatch):
+    """Test that a resume only renders seconds without a non-empty clip file."""
+    bank, sources = _fake_bank(tmp_path)
+    checkpoint_dir = tmp_path / "checkpoints"
+    checkpoint_dir.mkdir()
+    for sec in (0, 1, 2, 4):
+        (checkpoint_dir / f"clip_{sec:06d}.mp4").write_bytes(b"clip")
+    (checkpoint_dir / "clip_000003.mp4").write_bytes(b"")  # Torn write, must be redone
+    (checkpoint_dir / "clip_list.json").write_text(json.dumps(["clip_000000.mp4", "clip_000001.mp4"]))
+    (checkpoint_dir / "checkpoint.json").write_text(json.dumps({"last_completed_second": 2, "num_clips": 2}))
     
-    # Create a simple test clip (1 second, 1080x1920, black)
-    test_clip = ColorClip(size=(1080, 1920), color=(0, 0, 0), duration=1.0)
+    rendered = []
+    monkeypatch.setattr(visual_builder, "VISUAL_BUILD_WORKERS", 1)
+    monkeypatch.setattr(visual_builder, "_render_one_second", _fake_render(rendered))
     
-    # Add watermark
-    result = _add_watermark(test_clip, resolution=(1080, 1920))
+    clip_paths = _build(bank, sources, checkpoint_dir, 6)
     
-    # Verify result is a VideoFileClip-like object with correct duration
-    assert hasattr(result, 'duration') or hasattr(result, 'with_duration')
-    # Verify size is preserved
-    if hasattr(result, 'size') and result.size:
-        assert result.size == (1080, 1920)
+    assert rendered == [3, 5]
+    assert [p.name for p in clip_paths] == [f"clip_{sec:06d}.mp4" for sec in range(6)]
+    checkpoint = json.loads((checkpoint_dir / "checkpoint.json").read_text())
+    assert checkpoint == {"last_completed_second": 6, "num_clips": 6}
+
+
+def _write_checkpoint(checkpoint_dir, last_completed_second, num_clips, clip_list, logged):
+    """Write checkpoint.json, clip_list.json and concat_list.txt as a render would."""
+    checkpoint_dir.mkdir(exist_ok=True)
+    (checkpoint_dir / "checkpoint.json").write_text(json.dumps({
+        "last_completed_second": last_completed_second,
+        "num_clips": num_clips,
+    }))
+    (checkpoint_dir / "clip_list.json").write_text(json.dumps(clip_list))
+    (checkpoint_dir / "concat_list.txt").write_text("".join(f"file '{name}'\n" for name in logged))
+    (checkpoint_dir / "blacklist.json").write_text(json.dumps(["bad.mp4"]))
+
+
+def _clip_names(count):
+    return [f"clip_{sec:06d}.mp4" for sec in range(count)]
+
+
+def test_load_checkpoint_replays_concat_list(tmp_path):
+    """Test that clips saved after the last clip_list.json write come from the concat log."""
+    names = _clip_names(6)
+    # clip_list.json is from an earlier compaction; the log also has a clip
+    # written after the checkpoint, which must not be counted
+    _write_checkpoint(tmp_path, 5, 5, names[:2], names)
+    
+    start_sec, clip_paths, blacklist = load_checkpoint(tmp_path)
     
-    # Cleanup
-    test_clip.close()
-    if hasattr(result, 'close'):
-        result.close()
+    assert start_sec == 5
+    assert clip_paths == [tmp_path / name for name in names[:5]]
+    assert blacklist == {"bad.mp4"}
 
+
+def test_load_checkpoint_log_behind_checkpoint(tmp_path):
+    """Test that a concat log shorter than the checkpoint restarts the clip list."""
+    names = _clip_names(5)
+    _write_checkpoint(tmp_path, 5, 5, names[:2], names[:3])
+    # A torn final line is not counted as a logged clip
+    with open(tmp_path / "concat_list.txt", "a") as f:
+        f.write("file 'clip_000003")
+    
+    start_sec, clip_paths, blacklist = load_checkpoint(tmp_path)
+    
+    assert (start_sec, clip_paths) == (0, [])
+    assert blacklist == {"bad.mp4"}
+
+
+def test_load_checkpoint_stale_clip_list(tmp_path):
+    """Test that a clip_list.json that disagrees with the concat log restarts the clip list."""
+    names = _clip_names(5)
+    _write_checkpoint(tmp_path, 5, 5, ["clip_000009.mp4", "clip_000001.mp4"], names)
+    
+    start_sec, clip_paths, blacklist = load_checkpoint(tmp_path)
+    
+    assert (start_sec, clip_paths) == (0, [])
+    assert blacklist == {"bad.mp4"}
+
+
+def test_load_checkpoint_compacted_clip_list(tmp_path):
+    """Test that a freshly compacted clip_list.json is used without reading the log."""
+    names = _clip_names(4)
+    _write_checkpoint(tmp_path, 4, 4, names, [])
+    
+    start_sec, clip_paths, _ = load_checkpoint(tmp_path)
+    
+    assert start_sec == 4
+    assert clip_paths == [tmp_path / name for name in names]
+
+
+def test_build_visual_track_falls_back_when_source_fails_to_encode(tmp_path, monkeypatch):
+    """Test that a source failing to encode is replaced by another bank video, not a black frame."""
+    bank, sources = _fake_bank(tmp_path)
+    checkpoint_dir = tmp_path / "checkpoints"
+    encoded = []
+    black = []
+    
+    def fake_encode_clip(input_args, output_path, *args, **kwargs):
+        if input_args[-1].endswith("a.mp4"):
+            raise RuntimeError("corrupt stream")
+        encoded.append(Path(input_args[-1]).name)
+        output_path.write_bytes(b"clip")
+    
+    def fake_encode_black_clip(output_path, *args):
+        black.append(output_path.name)
+        output_path.write_bytes(b"black")
+    
+    monkeypatch.setattr(visual_builder, "VISUAL_BUILD_WORKERS", 1)
+    monkeypatch.setattr(visual_builder, "_encode_clip", fake_encode_clip)
+    monkeypatch.setattr(visual_builder, "_encode_black_clip", fake_encode_black_clip)
+    
+    clip_paths = _build(bank, sources, checkpoint_dir, 8)
+    
+    assert [p.name for p in clip_paths] == [f"clip_{sec:06d}.mp4" for sec in range(8)]
+    assert black == []
+    assert encoded == ["b.mp4"] * 8
+    assert json.loads((checkpoint_dir / "blacklist.json").read_text()) == ["a.mp4"]